@@ -0,0 +1,48 @@
+from dataclasses import dataclass, field
+from datetime import date
+
+from zgw_consumers.api_models.base import Model, factory, get_converter_plan
+
+
+@dataclass
+class Author(Model):
+    name: str
+    born: date | None = None
+
+
+@dataclass
+class Book(Model):
+    title: str
+    published: date
+    authors: list[Author]
+    editor: Author | None = None
+    tags: list[str] = field(default_factory=list)
+    extra_data: dict = field(default_factory=dict)
+
+
+def test_factory_converts_values() -> None:
+    data = {
+        "title": "A book",
+        "published": "2022-07-28",
+        "authors": [{"name": "A", "born": "1970-01-01"}],
+        "editor": {"name": "B"},
+        "tags": ["x"],
+        "extraData": {"someKey": 1},
+        "unknown": "ignored",
+    }
+
+    book = factory(Book, data)
+
+    assert book.title == "A book"
+    assert book.published == date(2022, 7, 28)
+    assert book.authors == [Author(name="A", born=date(1970, 1, 1))]
+    assert book.editor == Author(name="B")
+    assert book.tags == ["x"]
+    assert book.extra_data == {"some_key": 1}
+
+
+def test_converter_plan_skips_fields_used_as_is() -> None:
+    plan = get_converter_plan(Book)
+
+    assert [name for name, _ in plan] == ["published", "authors", "editor"]
+    assert get_converter_plan(Book) is plan
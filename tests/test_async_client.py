@@ -0,0 +1,125 @@
+import asyncio
+
+import httpx
+import jwt
+import pytest
+from ape_pie import InvalidURLError
+
+from zgw_consumers.async_client import build_async_client
+from zgw_consumers.constants import AuthTypes
+from zgw_consumers.test.factories import ServiceFactory
+
+
+def _run(client, *requests):
+    async def _send():
+        async with client:
+            return await asyncio.gather(*(client.get(url) for url in requests))
+
+    return asyncio.run(_send())
+
+
+def test_relative_urls_and_api_key_auth():
+    service = ServiceFactory.build(
+        api_root="https://example.com/api/v1/",
+        auth_type=AuthTypes.api_key,
+        header_key="Api-Key",
+        header_value="some-secret",
+    )
+    seen = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        seen.append(request)
+        return httpx.Response(200, json={})
+
+    client = build_async_client(service, transport=httpx.MockTransport(handler))
+    _run(client, "zaken", "https://example.com/api/v1/rollen")
+
+    assert sorted(str(request.url) for request in seen) == [
+        "https://example.com/api/v1/rollen",
+        "https://example.com/api/v1/zaken",
+    ]
+    assert all(request.headers["Api-Key"] == "some-secret" for request in seen)
+
+
+def test_other_base_url_is_rejected():
+    service = ServiceFactory.build(api_root="https://example.com/api/v1/")
+    client = build_async_client(
+        service, transport=httpx.MockTransport(lambda request: httpx.Response(200))
+    )
+
+    with pytest.raises(InvalidURLError):
+        _run(client, "https://evil.example.com/api/v1/zaken")
+
+
+def test_zgw_auth_retried_on_403():
+    service = ServiceFactory.build(
+        api_root="https://example.com/",
+        auth_type=AuthTypes.zgw,
+        client_id="my-client-id",
+        secret="my-secret-that-is-sufficiently-long-enough",
+    )
+    tokens = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        token = request.headers["Authorization"].removeprefix("Bearer ")
+        tokens.append(jwt.decode(token, service.secret, algorithms=["HS256"]))
+        return httpx.Response(403 if len(tokens) == 1 else 200)
+
+    client = build_async_client(service, transport=httpx.MockTransport(handler))
+    (response,) = _run(client, "zaken")
+
+    assert response.status_code == 200
+    assert len(tokens) == 2
+    assert tokens[0]["client_id"] == "my-client-id"
+
+
+def test_nlx_url_rewritten():
+    service = ServiceFactory.build(
+        api_root="https://example.com/",
+        nlx="http://localhost:8081/:serial-number/:service/",
+    )
+    seen = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        seen.append(str(request.url))
+        return httpx.Response(200, content=b"AAAAA")
+
+    client = build_async_client(service, transport=httpx.MockTransport(handler))
+    (response,) = _run(client, "some-resource")
+
+    assert seen == ["http://localhost:8081/:serial-number/:service/some-resource"]
+    assert response.content == b"AAAAA"
+
+
+def test_timeout_and_pool_limits():
+    service = ServiceFactory.build(timeout=5, pool_maxsize=20, pool_block=True)
+
+    client = build_async_client(service)
+
+    assert client.timeout == httpx.Timeout(5)
+    pool = client._transport._pool  # pyright: ignore[reportAttributeAccessIssue]
+    assert pool._max_connections == 20
+    assert pool._max_keepalive_connections == 20
+
+
+def test_connect_read_and_total_timeout():
+    service = ServiceFactory.build(connect_timeout=1, read_timeout=60, total_timeout=90)
+
+    client = build_async_client(service)
+
+    assert client.timeout == httpx.Timeout(10, connect=1, read=60)
+    assert client.total_timeout == 90
+
+
+def test_total_timeout_exceeded():
+    service = ServiceFactory.build(api_root="https://example.com/", total_timeout=1)
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        await asyncio.sleep(5)
+        return httpx.Response(200)
+
+    client = build_async_client(service, transport=httpx.MockTransport(handler))
+    client.total_timeout = 0.01
+
+    with pytest.raises(httpx.TimeoutException):
+        _run(client, "zaken")
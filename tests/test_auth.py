@@ -1,5 +1,6 @@
 import time
 from datetime import UTC, datetime
+from unittest import mock
 
 from django.core.cache import cache
 
@@ -8,7 +9,13 @@ import pytest
 import requests_mock
 from freezegun import freeze_time
 
-from zgw_consumers.client import ZGWAuth, build_client
+from zgw_consumers.client import (
+    ZGWAuth,
+    build_client,
+    get_oauth2_token_cache_key,
+    jwt_cache,
+    oauth2_token_cache,
+)
 from zgw_consumers.constants import AuthTypes
 from zgw_consumers.test.factories import ServiceFactory
 
@@ -16,8 +23,12 @@ from zgw_consumers.test.factories import ServiceFactory
 @pytest.fixture(autouse=True)
 def clear_cache():
     cache.clear()
+    jwt_cache.clear()
+    oauth2_token_cache.clear()
     yield
     cache.clear()
+    jwt_cache.clear()
+    oauth2_token_cache.clear()
 
 
 def test_zgw_auth_refresh_token():
@@ -75,6 +86,52 @@ def test_jwt_exp_configuration():
     assert exp == datetime(2025, 4, 1, 11, 57, 13, tzinfo=UTC)
 
 
+def test_zgw_auth_token_shared_between_instances():
+    service = ServiceFactory.build(
+        auth_type=AuthTypes.zgw,
+        client_id="my-client-id",
+        secret="my-secret-that-is-sufficiently-long-enough",
+    )
+
+    with freeze_time("2025-04-01T11:52:13Z"):
+        first = ZGWAuth(service)
+    with freeze_time("2025-04-01T11:52:20Z"):
+        second = ZGWAuth(service)
+
+    assert first._token == second._token
+
+
+def test_zgw_auth_token_renewed_before_expiry(settings):
+    settings.ZGW_JWT_RENEWAL_MARGIN = 30
+    service = ServiceFactory.build(
+        auth_type=AuthTypes.zgw,
+        client_id="my-client-id",
+        secret="my-secret-that-is-sufficiently-long-enough",
+        jwt_valid_for=5 * 60,
+    )
+
+    with requests_mock.Mocker() as m:
+        m.get(requests_mock.ANY, status_code=200)
+
+        with freeze_time("2025-04-01T11:52:13Z"):
+            client = build_client(service)
+            initial = client.get("irrelevant").request.headers["Authorization"]
+
+        # 4 minutes and 30 seconds later, the token expires in 30 seconds
+        with freeze_time("2025-04-01T11:56:43Z"):
+            renewed = client.get("irrelevant").request.headers["Authorization"]
+
+    assert renewed != initial
+    decoded = jwt.decode(
+        renewed.split(" ")[1],
+        "my-secret-that-is-sufficiently-long-enough",
+        algorithms=["HS256"],
+        # the token expired in real time
+        options={"verify_exp": False},
+    )
+    assert decoded["iat"] == datetime(2025, 4, 1, 11, 56, 43, tzinfo=UTC).timestamp()
+
+
 @pytest.fixture
 def oauth2_service():
     return ServiceFactory.build(
@@ -161,3 +218,99 @@ def test_token_is_cached(oauth2_service):
 
         post_requests = [r for r in m.request_history if r.method == "POST"]
         assert len(post_requests) == 1
+
+
+def test_token_refreshed_early(oauth2_service, settings):
+    settings.OAUTH2_TOKEN_REFRESH_FRACTION = 0.8
+
+    with requests_mock.Mocker() as m, freeze_time("2025-04-01T00:00:00Z") as frozen:
+        mock_token_response(m, access_token="first-token", expires_in=100)
+        m.get("https://example.com/irrelevant", text="OK")
+
+        client = build_client(oauth2_service)
+        client.get("irrelevant")
+
+        # still valid, but past 80% of its lifetime
+        frozen.tick(81)
+        mock_token_response(m, access_token="second-token", expires_in=100)
+        client.get("irrelevant")
+
+    post_requests = [r for r in m.request_history if r.method == "POST"]
+    assert len(post_requests) == 2
+    assert m.last_request.headers["Authorization"] == "Bearer second-token"
+
+
+def test_token_in_use_while_another_process_refreshes(oauth2_service):
+    with requests_mock.Mocker() as m, freeze_time("2025-04-01T00:00:00Z") as frozen:
+        mock_token_response(m, access_token="first-token", expires_in=100)
+        m.get("https://example.com/irrelevant", text="OK")
+
+        client = build_client(oauth2_service)
+        frozen.tick(81)
+        # another process holds the lease
+        cache.add(f"{get_oauth2_token_cache_key(oauth2_service)}:lock", True)
+        client.get("irrelevant")
+
+        # the token is kept in the process cache while the other process refreshes it
+        with (
+            mock.patch("zgw_consumers.client.cache") as mock_cache,
+            build_client(oauth2_service) as other_client,
+        ):
+            other_client.get("irrelevant")
+
+    mock_cache.get.assert_not_called()
+    post_requests = [r for r in m.request_history if r.method == "POST"]
+    assert len(post_requests) == 1
+    assert m.last_request.headers["Authorization"] == "Bearer first-token"
+
+
+def test_failed_early_refresh_keeps_current_token(oauth2_service):
+    with requests_mock.Mocker() as m, freeze_time("2025-04-01T00:00:00Z") as frozen:
+        mock_token_response(m, access_token="first-token", expires_in=100)
+        m.get("https://example.com/irrelevant", text="OK")
+
+        client = build_client(oauth2_service)
+        frozen.tick(81)
+        m.post("https://example.com/token/", status_code=500, json={})
+        client.get("irrelevant")
+
+    assert m.last_request.headers["Authorization"] == "Bearer first-token"
+    # the lease is released
+    assert cache.get(f"{get_oauth2_token_cache_key(oauth2_service)}:lock") is None
+
+
+def test_token_served_from_process_cache(oauth2_service):
+    with requests_mock.Mocker() as m:
+        mock_token_response(m, access_token="cached-token")
+        m.get("https://example.com/irrelevant", text="OK")
+
+        with build_client(oauth2_service) as client:
+            client.get("irrelevant")
+
+        with (
+            mock.patch("zgw_consumers.client.cache") as mock_cache,
+            build_client(oauth2_service) as client,
+        ):
+            client.get("irrelevant")
+            client.get("irrelevant")
+
+        mock_cache.get.assert_not_called()
+        assert m.last_request.headers["Authorization"] == "Bearer cached-token"
+
+
+def test_token_not_reused_after_scope_change(oauth2_service):
+    with requests_mock.Mocker() as m:
+        mock_token_response(m, access_token="first-token")
+        m.get("https://example.com/irrelevant", text="OK")
+
+        with build_client(oauth2_service) as client:
+            client.get("irrelevant")
+
+        oauth2_service.oauth2_scope = "other-scope"
+        # another process only has the shared cache
+        oauth2_token_cache.clear()
+        mock_token_response(m, access_token="second-token")
+        with build_client(oauth2_service) as client:
+            client.get("irrelevant")
+
+    assert m.last_request.headers["Authorization"] == "Bearer second-token"
@@ -0,0 +1,121 @@
+from unittest import mock
+
+from django.core.cache import cache
+
+import pytest
+from freezegun import freeze_time
+from requests import Response
+from requests.adapters import HTTPAdapter
+from requests.exceptions import ConnectionError
+
+from zgw_consumers.circuit_breaker import CircuitOpenError
+from zgw_consumers.client import build_client
+from zgw_consumers.test.factories import ServiceFactory
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+    yield
+    cache.clear()
+
+
+def make_response(status_code: int) -> Response:
+    response = Response()
+    response.status_code = status_code
+    return response
+
+
+@pytest.fixture
+def service():
+    return ServiceFactory.build(
+        api_root="https://example.com/",
+        circuit_breaker_threshold=2,
+        circuit_breaker_reset_timeout=30,
+    )
+
+
+def test_circuit_opens_after_threshold(service):
+    client = build_client(service)
+
+    with mock.patch.object(
+        HTTPAdapter, "send", return_value=make_response(503)
+    ) as mock_send:
+        client.get("zaken")
+        client.get("zaken")
+
+        with pytest.raises(CircuitOpenError):
+            client.get("zaken")
+
+    assert mock_send.call_count == 2
+
+
+def test_connection_errors_count_as_failures(service):
+    client = build_client(service)
+
+    with mock.patch.object(HTTPAdapter, "send", side_effect=ConnectionError):
+        for _ in range(2):
+            with pytest.raises(ConnectionError):
+                client.get("zaken")
+
+        with pytest.raises(CircuitOpenError):
+            client.get("zaken")
+
+
+def test_success_resets_failures(service):
+    client = build_client(service)
+    responses = [make_response(503), make_response(200)] * 3
+
+    with mock.patch.object(HTTPAdapter, "send", side_effect=responses) as mock_send:
+        for _ in range(6):
+            client.get("zaken")
+
+    assert mock_send.call_count == 6
+
+
+def test_circuit_shared_between_clients(service):
+    with mock.patch.object(HTTPAdapter, "send", return_value=make_response(500)):
+        client = build_client(service)
+        client.get("zaken")
+        client.get("zaken")
+
+        with pytest.raises(CircuitOpenError):
+            build_client(service).get("zaken")
+
+
+def test_half_open_probe(service):
+    client = build_client(service)
+
+    with freeze_time("2025-04-01T00:00:00Z") as frozen:
+        with mock.patch.object(HTTPAdapter, "send", return_value=make_response(503)):
+            client.get("zaken")
+            client.get("zaken")
+
+        frozen.tick(31)
+        # a failing probe opens the circuit again
+        with mock.patch.object(HTTPAdapter, "send", return_value=make_response(503)):
+            client.get("zaken")
+            with pytest.raises(CircuitOpenError):
+                client.get("zaken")
+
+        frozen.tick(31)
+        with mock.patch.object(
+            HTTPAdapter, "send", return_value=make_response(200)
+        ) as mock_send:
+            client.get("zaken")
+            client.get("zaken")
+
+    assert mock_send.call_count == 2
+
+
+def test_disabled_by_default():
+    service = ServiceFactory.build(api_root="https://example.com/")
+    client = build_client(service)
+
+    with mock.patch.object(
+        HTTPAdapter, "send", return_value=make_response(503)
+    ) as mock_send:
+        for _ in range(10):
+            client.get("zaken")
+
+    assert mock_send.call_count == 10
@@ -1,11 +1,13 @@
 import time
 
 import jwt
+import pytest
 import requests_mock
 from freezegun import freeze_time
 
-from zgw_consumers.client import build_client
+from zgw_consumers.client import build_client, client_pool, get_client
 from zgw_consumers.constants import AuthTypes
+from zgw_consumers.models import Service
 from zgw_consumers.test.factories import ServiceFactory
 
 
@@ -105,3 +107,58 @@ def test_retry_request_on_403_no_auth():
         history = m.request_history
 
         assert len(history) == 1
+
+
+@pytest.fixture
+def clear_client_pool():
+    client_pool.clear()
+    yield
+    client_pool.clear()
+
+
+@pytest.mark.django_db
+@pytest.mark.usefixtures("clear_client_pool")
+def test_get_client_reuses_client():
+    service = ServiceFactory.create(api_root="https://example.com/")
+
+    client = get_client(service)
+
+    assert get_client(Service.objects.get(pk=service.pk)) is client
+
+
+@pytest.mark.django_db
+@pytest.mark.usefixtures("clear_client_pool")
+def test_get_client_rebuilt_on_config_change():
+    service = ServiceFactory.create(api_root="https://example.com/", timeout=10)
+    client = get_client(service)
+
+    service.timeout = 5
+    service.save()
+
+    new_client = get_client(service)
+    assert new_client is not client
+    assert new_client._request_kwargs["timeout"] == 5
+
+
+@pytest.mark.django_db
+@pytest.mark.usefixtures("clear_client_pool")
+def test_get_client_context_manager_does_not_close_session():
+    service = ServiceFactory.create(api_root="https://example.com/")
+    client = get_client(service)
+
+    with requests_mock.Mocker() as m:
+        m.get("https://example.com/foo", text="OK")
+
+        with client:
+            client.get("foo")
+        client.get("foo")
+
+    assert client._in_context_manager
+    assert get_client(service) is client
+
+
+def test_get_client_unsaved_service():
+    service = ServiceFactory.build()
+
+    with pytest.raises(ValueError):
+        get_client(service)
@@ -1,13 +1,24 @@
+import asyncio
+import threading
 import time
 import uuid
+from concurrent import futures
 
 from django.conf import settings
-from django.db import connection
+from django.db import connection, connections
 from django.db.utils import ConnectionHandler
 
+import pytest
 from tabulate import tabulate
 
-from zgw_consumers.concurrent import parallel
+from zgw_consumers.concurrent import (
+    SharedPoolExecutor,
+    aparallel,
+    gather_limited,
+    get_shared_executor,
+    parallel,
+    run_in_thread,
+)
 
 TEST_QUERY = f"SELECT '{uuid.uuid4()}'"
 
@@ -77,3 +88,205 @@ def test_db_connection_cleaned_up_map(db: None):
         num_conns = get_num_connections()
 
     assert num_conns == initial
+
+
+def execute_query_get_pid(*args) -> int:
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT pg_backend_pid()")
+        (pid,) = cursor.fetchone()
+        cursor.execute(TEST_QUERY)
+    return pid
+
+
+def test_db_connection_reused_within_block(db: None, monkeypatch):
+    monkeypatch.setitem(connections.settings["default"], "CONN_MAX_AGE", 60)
+
+    with parallel(max_workers=1) as executor:
+        first = executor.submit(execute_query_get_pid).result()
+        second = executor.submit(execute_query_get_pid).result()
+
+    assert first == second
+    assert get_num_connections() == 0
+
+
+def test_shared_pool_closes_db_connection_when_idle(db: None, monkeypatch):
+    monkeypatch.setitem(connections.settings["default"], "CONN_MAX_AGE", None)
+
+    with parallel(shared=True, max_workers=1) as executor:
+        executor.submit(execute_query_get_pid).result()
+
+    # the worker thread closes its connection after resolving the future
+    deadline = time.monotonic() + 5
+    while (num_connections := get_num_connections()) and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert num_connections == 0
+
+
+def test_run_in_thread_closes_db_connection(db: None, monkeypatch):
+    monkeypatch.setitem(connections.settings["default"], "CONN_MAX_AGE", None)
+
+    pid = asyncio.run(run_in_thread(execute_query_get_pid))
+
+    assert pid
+    assert get_num_connections() == 0
+
+
+def test_gather_limited_respects_limit():
+    running = 0
+    max_running = 0
+
+    async def task(value: int) -> int:
+        nonlocal running, max_running
+        running += 1
+        max_running = max(max_running, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+        return value
+
+    async def main():
+        return await gather_limited(*(task(i) for i in range(10)), limit=3)
+
+    results = asyncio.run(main())
+
+    assert results == list(range(10))
+    assert max_running == 3
+
+
+def test_aparallel_runs_coroutines_and_sync_callables():
+    main_thread = threading.get_ident()
+
+    async def async_task(value: int) -> int:
+        await asyncio.sleep(0)
+        return value * 2
+
+    def sync_task(value: int) -> tuple[int, bool]:
+        return value * 3, threading.get_ident() != main_thread
+
+    async def main():
+        async with aparallel(max_concurrency=2) as executor:
+            doubled = executor.submit(async_task, 2)
+            tripled = executor.submit(sync_task, 2)
+            mapped = await executor.map(async_task, [1, 2, 3])
+        return doubled.result(), tripled.result(), mapped
+
+    doubled, tripled, mapped = asyncio.run(main())
+
+    assert doubled == 4
+    assert tripled == (6, True)
+    assert mapped == [2, 4, 6]
+
+
+def test_aparallel_cancels_remaining_tasks_on_error():
+    cancelled = False
+
+    async def slow_task():
+        nonlocal cancelled
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled = True
+            raise
+
+    async def failing_task():
+        raise ValueError("boom")
+
+    async def main():
+        async with aparallel() as executor:
+            executor.submit(slow_task)
+            executor.submit(failing_task)
+
+    with pytest.raises(ExceptionGroup):
+        asyncio.run(main())
+
+    assert cancelled
+
+
+def test_shared_pool_is_reused():
+    def get_thread_name():
+        return threading.current_thread().name
+
+    with parallel(shared=True) as executor:
+        first = executor.submit(get_thread_name).result()
+
+    with parallel(shared=True) as executor:
+        executor.submit(get_thread_name).result()
+
+    assert first.startswith("zgw_consumers")
+    assert not get_shared_executor()._shutdown
+
+
+def test_shared_pool_limits_concurrency_per_block():
+    lock = threading.Lock()
+    running = 0
+    max_running = 0
+
+    def task(value: int) -> int:
+        nonlocal running, max_running
+        with lock:
+            running += 1
+            max_running = max(max_running, running)
+        time.sleep(0.01)
+        with lock:
+            running -= 1
+        return value
+
+    with parallel(shared=True, max_workers=2) as executor:
+        results = list(executor.map(task, range(8)))
+
+    assert results == list(range(8))
+    assert max_running <= 2
+
+
+def test_shared_pool_cancels_pending_calls_on_error():
+    started = threading.Event()
+
+    def blocking():
+        started.set()
+        # keep the only worker of the block busy until the block has exited
+        time.sleep(0.2)
+
+    with (
+        pytest.raises(ValueError),
+        parallel(shared=True, max_workers=1) as executor,
+    ):
+        running = executor.submit(blocking)
+        pending = executor.submit(time.sleep, 0)
+        started.wait(timeout=5)
+        raise ValueError("boom")
+
+    assert running.done()
+    assert pending.cancelled()
+
+
+def test_shared_pool_runs_nested_calls_inline():
+    def inner() -> str:
+        return threading.current_thread().name
+
+    def outer() -> tuple[str, list[str]]:
+        with parallel(shared=True) as executor:
+            names = list(executor.map(lambda _: inner(), range(4)))
+        return threading.current_thread().name, names
+
+    with parallel(shared=True) as executor:
+        # more outer calls than the pool has threads, all waiting for nested calls
+        results = list(executor.map(lambda _: outer(), range(64)))
+
+    for outer_name, inner_names in results:
+        assert inner_names == [outer_name] * 4
+
+
+def test_shared_pool_resolves_calls_that_cannot_be_dispatched():
+    pool = futures.ThreadPoolExecutor(max_workers=1)
+    executor = SharedPoolExecutor(pool, max_workers=1)
+    release = threading.Event()
+
+    running = executor.submit(release.wait, timeout=5)
+    pending = executor.submit(time.sleep, 0)
+    # the pending call can't be handed to the pool when the running one completes
+    pool.shutdown(wait=False)
+    release.set()
+    executor.shutdown(wait=True)
+
+    assert running.result() is True
+    with pytest.raises(RuntimeError):
+        pending.result()
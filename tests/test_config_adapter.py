@@ -1,10 +1,14 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
 import pytest
 import requests_mock
 from ape_pie import APIClient
 from simple_certmanager.constants import CertificateTypes
 from simple_certmanager.test.factories import CertificateFactory
+from urllib3.util import Timeout
 
-from zgw_consumers.client import ServiceConfigAdapter
+from zgw_consumers.client import ServiceConfigAdapter, build_client
 from zgw_consumers.constants import AuthTypes
 from zgw_consumers.test.factories import ServiceFactory
 
@@ -165,3 +169,153 @@ def test_custom_timeout():
 
     timeout = m.last_request.timeout
     assert timeout == 30
+
+
+def test_connect_and_read_timeout():
+    service = ServiceFactory.build(
+        api_root="https://example.com/", connect_timeout=1, read_timeout=60
+    )
+    client = build_client(service)
+
+    with requests_mock.Mocker() as m, client:
+        m.get("https://example.com/foo")
+
+        client.get("foo")
+
+    assert m.last_request.timeout == (1, 60)
+
+
+def test_total_timeout():
+    service = ServiceFactory.build(
+        api_root="https://example.com/", timeout=5, read_timeout=60, total_timeout=90
+    )
+
+    timeout = ServiceConfigAdapter(service).get_client_session_kwargs()["timeout"]
+
+    assert isinstance(timeout, Timeout)
+    assert timeout.connect_timeout == 5
+    assert timeout.read_timeout == 60
+    assert timeout.total == 90
+
+
+def test_default_connection_pool_settings(settings):
+    settings.CLIENT_POOL_CONNECTIONS = 5
+    settings.CLIENT_POOL_MAXSIZE = 15
+    service = ServiceFactory.build()
+
+    client = build_client(service)
+
+    adapter = client.get_adapter("https://example.com/")
+    assert adapter._pool_connections == 5
+    assert adapter._pool_maxsize == 15
+    assert adapter._pool_block is False
+    assert adapter.poolmanager.connection_pool_kw["maxsize"] == 15
+    assert client.headers["Connection"] == "keep-alive"
+
+
+def test_service_connection_pool_settings():
+    service = ServiceFactory.build(
+        pool_connections=2, pool_maxsize=50, pool_block=True, keep_alive=False
+    )
+
+    client = build_client(service)
+
+    for url in ("https://example.com/", "http://example.com/"):
+        adapter = client.get_adapter(url)
+        assert adapter._pool_connections == 2
+        assert adapter._pool_maxsize == 50
+        assert adapter._pool_block is True
+    assert client.headers["Connection"] == "close"
+
+
+def test_connection_pool_settings_without_build_client():
+    service = ServiceFactory.build(pool_maxsize=50, keep_alive=False)
+
+    client = APIClient.configure_from(ServiceConfigAdapter(service))
+
+    assert client.get_adapter("https://example.com/")._pool_maxsize == 50
+    assert client.headers["Connection"] == "close"
+    assert "User-Agent" in client.headers
+
+
+def test_no_retries_by_default():
+    service = ServiceFactory.build()
+
+    client = build_client(service)
+
+    retries = client.get_adapter("https://example.com/").max_retries
+    assert retries.total == 0
+    assert retries.read is False
+
+
+def test_service_retry_settings():
+    service = ServiceFactory.build(
+        max_retries=3,
+        retry_backoff_factor=0.2,
+        retry_backoff_jitter=0.1,
+        retry_status_codes="429,503",
+        retry_idempotent_only=False,
+        retry_respect_retry_after=False,
+    )
+
+    client = build_client(service)
+
+    retries = client.get_adapter("https://example.com/").max_retries
+    assert retries.total == 3
+    assert retries.backoff_factor == 0.2
+    assert retries.backoff_jitter == 0.1
+    assert retries.status_forcelist == [429, 503]
+    assert retries.allowed_methods is None
+    assert retries.respect_retry_after_header is False
+    assert retries.raise_on_status is False
+
+
+@pytest.fixture
+def flaky_server():
+    responses = iter([503, 503, 200])
+    requests = []
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            requests.append(self.path)
+            self.send_response(next(responses, 200))
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+
+        do_POST = do_GET
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_port}/", requests
+    server.shutdown()
+    server.server_close()
+
+
+def test_transient_errors_are_retried(flaky_server):
+    api_root, requests = flaky_server
+    service = ServiceFactory.build(
+        api_root=api_root, max_retries=2, retry_backoff_factor=0
+    )
+
+    with build_client(service) as client:
+        response = client.get("resource")
+
+    assert response.status_code == 200
+    assert len(requests) == 3
+
+
+def test_non_idempotent_requests_are_not_retried(flaky_server):
+    api_root, requests = flaky_server
+    service = ServiceFactory.build(
+        api_root=api_root, max_retries=2, retry_backoff_factor=0
+    )
+
+    with build_client(service) as client:
+        response = client.post("resource")
+
+    assert response.status_code == 503
+    assert len(requests) == 1
@@ -81,6 +81,21 @@ def test_execute_configuration_step_with_required_fields():
     assert objects_service.api_type == APITypes.orc
     assert objects_service.auth_type == AuthTypes.zgw
     assert objects_service.timeout == 10
+    assert objects_service.connect_timeout is None
+    assert objects_service.read_timeout is None
+    assert objects_service.total_timeout is None
+    assert objects_service.pool_connections is None
+    assert objects_service.pool_maxsize is None
+    assert objects_service.pool_block is False
+    assert objects_service.keep_alive is True
+    assert objects_service.max_retries == 0
+    assert objects_service.retry_backoff_factor == 0.5
+    assert objects_service.retry_backoff_jitter == 0.0
+    assert objects_service.retry_status_codes == "429,502,503,504"
+    assert objects_service.retry_idempotent_only is True
+    assert objects_service.retry_respect_retry_after is True
+    assert objects_service.circuit_breaker_threshold == 0
+    assert objects_service.circuit_breaker_reset_timeout == 30
 
     # Not required fields
     assert objects_service.api_connection_check_path == ""
@@ -122,6 +137,21 @@ def test_execute_configuration_step_with_all_fields():
     assert objects_service.user_id == "open-formulieren"
     assert objects_service.user_representation == "Open Formulieren"
     assert objects_service.timeout == 5
+    assert objects_service.connect_timeout == 1
+    assert objects_service.read_timeout == 60
+    assert objects_service.total_timeout == 90
+    assert objects_service.pool_connections == 2
+    assert objects_service.pool_maxsize == 20
+    assert objects_service.pool_block is True
+    assert objects_service.keep_alive is False
+    assert objects_service.max_retries == 3
+    assert objects_service.retry_backoff_factor == 1.5
+    assert objects_service.retry_backoff_jitter == 0.25
+    assert objects_service.retry_status_codes == "502,503"
+    assert objects_service.retry_idempotent_only is False
+    assert objects_service.retry_respect_retry_after is False
+    assert objects_service.circuit_breaker_threshold == 5
+    assert objects_service.circuit_breaker_reset_timeout == 60
     assert objects_service.jwt_valid_for == 42
 
 
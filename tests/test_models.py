@@ -59,3 +59,33 @@ def test_fields_making_up_natural_key_field_are_unique():
 
     with pytest.raises(IntegrityError):
         ServiceFactory.create(slug="i-should-be-unique")
+
+
+@pytest.mark.django_db
+def test_get_services_for_urls(django_assert_num_queries):
+    root = ServiceFactory.create(api_root="https://example.com/api/")
+    nested = ServiceFactory.create(api_root="https://example.com/api/v1/")
+    other = ServiceFactory.create(api_root="https://other.example.com/")
+
+    with django_assert_num_queries(1):
+        services = Service.get_services_for_urls(
+            [
+                "https://example.com/api/foo/1",
+                "https://example.com/api/v1/bar/2",
+                "https://other.example.com/baz/3",
+                "https://unknown.example.com/4",
+            ]
+        )
+
+    assert services == {
+        "https://example.com/api/foo/1": root,
+        "https://example.com/api/v1/bar/2": nested,
+        "https://other.example.com/baz/3": other,
+        "https://unknown.example.com/4": None,
+    }
+
+
+@pytest.mark.django_db
+def test_get_services_for_urls_empty(django_assert_num_queries):
+    with django_assert_num_queries(0):
+        assert Service.get_services_for_urls([]) == {}
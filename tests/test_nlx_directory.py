@@ -1,10 +1,15 @@
+import time
 from importlib import reload
 
+from django.core.cache import cache
+
 import pytest
+from freezegun import freeze_time
 
 from zgw_consumers import settings as zgw_settings
 from zgw_consumers.constants import NLXDirectories
 from zgw_consumers.models import NLXConfig
+from zgw_consumers.nlx import get_directory_cache_key, get_nlx_services
 
 
 def _reload_settings():
@@ -41,3 +46,67 @@ def test_prod_directory_url_overridden_by_envvar(monkeypatch):
     config.directory = NLXDirectories.prod
     url = config.directory_url
     assert url == custom_prod
+
+
+@pytest.fixture
+def nlx_config(settings):
+    settings.NLX_DIRECTORY_URLS = {NLXDirectories.demo: "https://directory.example/"}
+    config = NLXConfig.get_solo()
+    config.directory = NLXDirectories.demo
+    config.outway = "http://outway.example:8080/"
+    config.save()
+    cache.clear()
+    yield config
+    cache.clear()
+
+
+def mock_directory(requests_mock, name: str):
+    return requests_mock.get(
+        "https://directory.example/api/directory/list-services",
+        json={
+            "services": [
+                {"name": name, "organization": {"serial_number": "1", "name": "Org"}}
+            ]
+        },
+    )
+
+
+@pytest.mark.django_db
+def test_nlx_services_cached(nlx_config, requests_mock):
+    mock = mock_directory(requests_mock, "zaken")
+
+    services = get_nlx_services()
+    assert get_nlx_services() == services
+
+    assert mock.call_count == 1
+    assert mock.last_request.timeout == 10
+    ((organization, org_services),) = services
+    assert organization["serial_number"] == "1"
+    assert [service["name"] for service in org_services] == ["zaken"]
+
+
+@pytest.mark.django_db
+def test_stale_nlx_services_refreshed_in_background(nlx_config, requests_mock):
+    cache_key = get_directory_cache_key("https://directory.example/")
+    mock_directory(requests_mock, "zaken")
+    with freeze_time("2025-04-01T10:00:00Z"):
+        get_nlx_services()
+        # the entry expires in real time
+        initial_fetched_at, _ = cache.get(cache_key)
+
+    mock = mock_directory(requests_mock, "documenten")
+    with freeze_time("2025-04-01T11:00:01Z"):
+        ((_, services),) = get_nlx_services()
+        # the stale result is returned immediately
+        assert services[0]["name"] == "zaken"
+
+        # wait for the background refresh
+        for _ in range(50):
+            if cache.get(cache_key)[0] != initial_fetched_at:
+                break
+            time.sleep(0.02)
+
+        ((_, services),) = get_nlx_services()
+
+    assert mock.call_count == 1
+    assert services[0]["name"] == "documenten"
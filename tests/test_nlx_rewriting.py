@@ -1,12 +1,28 @@
+import json
+
+from django.core.cache import cache
+
 import pytest
+from freezegun import freeze_time
 
 from zgw_consumers.client import build_client
 from zgw_consumers.constants import AuthTypes
+from zgw_consumers.models import Service
+from zgw_consumers.nlx import Rewriter, RewriteTableCache, rewrite_table_cache
+from zgw_consumers.registry import bump_shared_version
 from zgw_consumers.test.factories import ServiceFactory
 
 pytestmark = [pytest.mark.django_db]
 
 
+@pytest.fixture(autouse=True)
+def clear_rewrite_table():
+    # the database changes of other tests are rolled back without signals
+    rewrite_table_cache.invalidate()
+    yield
+    rewrite_table_cache.invalidate()
+
+
 def test_request_url_and_response_data_rewritten(requests_mock):
     nlx_service = ServiceFactory.create(
         label="Service with NLX",
@@ -83,3 +99,243 @@ def test_service_without_nlx(requests_mock):
     assert requests_mock.last_request.url, "https://second.example.com/some-resource"
     # no rewriting of any sorts
     assert response_data, {"url": "https://example.com"}
+
+
+def test_rewrite_table_is_cached(django_assert_num_queries):
+    ServiceFactory.create(
+        api_root="https://example.com/",
+        nlx="http://localhost:8081/:serial-number/:service/",
+    )
+    Rewriter()
+    data = {
+        "results": [
+            {"url": f"http://localhost:8081/:serial-number/:service/zaken/{i}"}
+            for i in range(100)
+        ]
+    }
+
+    with django_assert_num_queries(0):
+        Rewriter().backwards(data)
+
+    assert data["results"][99] == {"url": "https://example.com/zaken/99"}
+
+
+def test_rewrite_table_updated_on_service_change():
+    service = ServiceFactory.create(
+        api_root="https://example.com/",
+        nlx="http://localhost:8081/:serial-number/:service/",
+    )
+    data = ["http://localhost:8081/:serial-number/:service/zaken/1"]
+    Rewriter().backwards(data)
+    assert data == ["https://example.com/zaken/1"]
+
+    service.nlx = "http://localhost:8082/:serial-number/:service/"
+    service.save()
+
+    data = ["http://localhost:8082/:serial-number/:service/zaken/1"]
+    Rewriter().backwards(data)
+    assert data == ["https://example.com/zaken/1"]
+
+
+@pytest.mark.parametrize("shared_cache", [None, "default"])
+def test_rewrite_table_updated_after_change_in_other_process(
+    settings, shared_cache: str | None
+):
+    settings.SERVICE_INDEX_CACHE = shared_cache
+    settings.SERVICE_INDEX_CHECK_INTERVAL = 5
+    ServiceFactory.create(
+        api_root="https://example.com/",
+        nlx="http://localhost:8081/:serial-number/:service/",
+    )
+    with freeze_time() as frozen_time:
+        table_cache = RewriteTableCache()
+        table = table_cache.get_table()
+
+        # simulate a change in another process, which only bumps the shared version
+        Service.objects.update(nlx="http://localhost:8082/:serial-number/:service/")
+        if shared_cache:
+            bump_shared_version(cache)
+
+        assert table_cache.get_table() is table
+
+        frozen_time.tick(5)
+        assert table_cache.get_table().backwards.rewrites == [
+            ("http://localhost:8082/:serial-number/:service/", "https://example.com/")
+        ]
+
+
+def test_rewrite_table_not_recompiled_without_changes(settings):
+    settings.SERVICE_INDEX_CHECK_INTERVAL = 0
+    ServiceFactory.create(
+        api_root="https://example.com/",
+        nlx="http://localhost:8081/:serial-number/:service/",
+    )
+    table_cache = RewriteTableCache()
+
+    assert table_cache.get_table() is table_cache.get_table()
+
+
+def test_longest_prefix_is_rewritten():
+    ServiceFactory.create(
+        api_root="https://example.com/",
+        nlx="http://localhost:8081/example/",
+    )
+    ServiceFactory.create(
+        api_root="https://example.com/zaken/",
+        nlx="http://localhost:8081/example/zaken/",
+    )
+    data = {
+        "zaak": "http://localhost:8081/example/zaken/api/1",
+        "nested": [["http://localhost:8081/example/other"], 1, None],
+    }
+
+    Rewriter().backwards(data)
+
+    assert data == {
+        "zaak": "https://example.com/zaken/api/1",
+        "nested": [["https://example.com/other"], 1, None],
+    }
+
+
+def test_json_body_rewritten_without_reencoding(requests_mock):
+    nlx_service = ServiceFactory.create(
+        api_root="https://example.com/",
+        auth_type=AuthTypes.no_auth,
+        nlx="http://localhost:8081/:serial-number/:service/",
+    )
+    client = build_client(nlx_service)
+    body = (
+        b'{"url":"http://localhost:8081/:serial-number/:service/zaken/1",'
+        b'"escaped":"http:\\/\\/localhost:8081\\/:serial-number\\/:service\\/rollen",'
+        b'"text":"The URL is \\"http://localhost:8081/:serial-number/:service/\\""}'
+    )
+    requests_mock.get(
+        "http://localhost:8081/:serial-number/:service/zaken/1",
+        content=body,
+        headers={"Content-Type": "application/hal+json"},
+    )
+
+    with client:
+        response = client.get("zaken/1")
+
+    assert response.content == (
+        b'{"url":"https://example.com/zaken/1",'
+        b'"escaped":"https:\\/\\/example.com\\/rollen",'
+        b'"text":"The URL is \\"http://localhost:8081/:serial-number/:service/\\""}'
+    )
+    assert response.json() == {
+        "url": "https://example.com/zaken/1",
+        "escaped": "https://example.com/rollen",
+        "text": 'The URL is "http://localhost:8081/:serial-number/:service/"',
+    }
+
+
+def test_json_object_keys_rewritten(requests_mock):
+    """
+    The byte-level rewriting doesn't distinguish keys from values, URLs used as keys
+    are rewritten too.
+    """
+    nlx_service = ServiceFactory.create(
+        api_root="https://example.com/",
+        auth_type=AuthTypes.no_auth,
+        nlx="http://localhost:8081/:serial-number/:service/",
+    )
+    client = build_client(nlx_service)
+    requests_mock.get(
+        "http://localhost:8081/:serial-number/:service/zaken/1",
+        json={"http://localhost:8081/:serial-number/:service/rollen/1": "role"},
+        headers={"Content-Type": "application/json"},
+    )
+
+    with client:
+        response = client.get("zaken/1")
+
+    assert response.json() == {"https://example.com/rollen/1": "role"}
+
+
+def test_raw_body_read_rewritten(requests_mock):
+    nlx_service = ServiceFactory.create(
+        api_root="https://example.com/",
+        auth_type=AuthTypes.no_auth,
+        nlx="http://localhost:8081/:serial-number/:service/",
+    )
+    client = build_client(nlx_service)
+    requests_mock.get(
+        "http://localhost:8081/:serial-number/:service/zaken/1",
+        content=b'{"url":"http://localhost:8081/:serial-number/:service/zaken/1"}',
+        headers={"Content-Type": "application/json"},
+    )
+
+    with client:
+        response = client.get("zaken/1", stream=True)
+        head = response.raw.read(10)
+        body = head + response.raw.read()
+
+    assert body == b'{"url":"https://example.com/zaken/1"}'
+
+
+def test_non_json_content_type_not_rewritten(requests_mock):
+    nlx_service = ServiceFactory.create(
+        api_root="https://example.com/",
+        auth_type=AuthTypes.no_auth,
+        nlx="http://localhost:8081/:serial-number/:service/",
+    )
+    client = build_client(nlx_service)
+    body = b'"http://localhost:8081/:serial-number/:service/"'
+    requests_mock.get(
+        "http://localhost:8081/:serial-number/:service/file",
+        content=body,
+        headers={"Content-Type": "application/octet-stream"},
+    )
+
+    with client:
+        response = client.get("file")
+
+    assert response.content == body
+
+
+def test_streamed_json_body_rewritten_in_chunks(requests_mock):
+    nlx_service = ServiceFactory.create(
+        api_root="https://example.com/",
+        auth_type=AuthTypes.no_auth,
+        nlx="http://localhost:8081/:serial-number/:service/",
+    )
+    client = build_client(nlx_service)
+    requests_mock.get(
+        "http://localhost:8081/:serial-number/:service/zaken",
+        json={
+            "results": [
+                {"url": f"http://localhost:8081/:serial-number/:service/zaken/{i}"}
+                for i in range(20)
+            ]
+        },
+        headers={"Content-Type": "application/json"},
+    )
+
+    with client:
+        response = client.get("zaken", stream=True)
+        chunks = list(response.iter_content(chunk_size=7))
+
+    assert len(chunks) > 1
+    assert json.loads(b"".join(chunks)) == {
+        "results": [{"url": f"https://example.com/zaken/{i}"} for i in range(20)]
+    }
+
+
+def test_streamed_body_without_content_type_not_read(requests_mock):
+    nlx_service = ServiceFactory.create(
+        api_root="https://example.com/",
+        auth_type=AuthTypes.no_auth,
+        nlx="http://localhost:8081/:serial-number/:service/",
+    )
+    client = build_client(nlx_service)
+    requests_mock.get(
+        "http://localhost:8081/:serial-number/:service/file",
+        content=b"AAAAA",
+    )
+
+    with client:
+        response = client.get("file", stream=True)
+
+        assert response._content is False
+        assert b"".join(response.iter_content(chunk_size=2)) == b"AAAAA"
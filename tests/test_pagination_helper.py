@@ -1,9 +1,17 @@
+from dataclasses import dataclass
+
 import pytest
 
+from zgw_consumers.api_models.base import Model
 from zgw_consumers.client import build_client
 from zgw_consumers.constants import APITypes, AuthTypes
 from zgw_consumers.models import Service
-from zgw_consumers.service import pagination_helper
+from zgw_consumers.service import (
+    PaginationCursor,
+    model_pagination_helper,
+    pagination_helper,
+    parallel_pagination_helper,
+)
 
 pytestmark = pytest.mark.django_db
 
@@ -128,3 +136,315 @@ def test_paginated_results_max_requests(settings, requests_mock):
     all_data = pagination_helper(client, data, max_requests=1)
 
     assert list(all_data) == [{"name": "A"}, {"name": "B"}]
+
+
+def _register_pages(requests_mock, num_pages: int) -> None:
+    for page in range(1, num_pages + 1):
+        requests_mock.get(
+            f"{BOOK_API_ROOT}books?page={page}",
+            complete_qs=True,
+            json={
+                "count": num_pages,
+                "next": (
+                    f"{BOOK_API_ROOT}books?page={page + 1}"
+                    if page < num_pages
+                    else None
+                ),
+                "previous": None,
+                "results": [{"name": str(page)}],
+            },
+        )
+
+
+def test_paginated_results_many_pages(requests_mock):
+    """
+    check that the number of pages is not limited by the recursion limit
+    """
+    _register_pages(requests_mock, 2000)
+    service = Service.objects.create(
+        api_type=APITypes.orc,
+        api_root=BOOK_API_ROOT,
+        auth_type=AuthTypes.no_auth,
+    )
+    client = build_client(service)
+    data = client.get("books", params={"page": 1}).json()
+
+    all_data = list(pagination_helper(client, data))
+
+    assert len(all_data) == 2000
+    assert all_data[-1] == {"name": "2000"}
+
+
+def test_paginated_results_prefetch(requests_mock):
+    _register_pages(requests_mock, 5)
+    service = Service.objects.create(
+        api_type=APITypes.orc,
+        api_root=BOOK_API_ROOT,
+        auth_type=AuthTypes.no_auth,
+    )
+
+    with build_client(service) as client:
+        data = client.get("books", params={"page": 1}).json()
+        all_data = list(pagination_helper(client, data, prefetch=True))
+
+    assert all_data == [{"name": str(page)} for page in range(1, 6)]
+
+
+def test_paginated_results_prefetch_max_requests(requests_mock):
+    _register_pages(requests_mock, 5)
+    service = Service.objects.create(
+        api_type=APITypes.orc,
+        api_root=BOOK_API_ROOT,
+        auth_type=AuthTypes.no_auth,
+    )
+
+    with build_client(service) as client:
+        data = client.get("books", params={"page": 1}).json()
+        all_data = list(pagination_helper(client, data, max_requests=2, prefetch=True))
+
+    assert all_data == [{"name": "1"}, {"name": "2"}, {"name": "3"}]
+    # no page was fetched beyond the limit
+    assert requests_mock.call_count == 3
+
+
+def _register_count_pages(requests_mock, num_results: int, page_size: int) -> None:
+    num_pages = -(-num_results // page_size)
+    for page in range(1, num_pages + 1):
+        start = (page - 1) * page_size
+        requests_mock.get(
+            f"{BOOK_API_ROOT}books?page={page}&ordering=name",
+            complete_qs=True,
+            json={
+                "count": num_results,
+                "next": (
+                    f"{BOOK_API_ROOT}books?ordering=name&page={page + 1}"
+                    if page < num_pages
+                    else None
+                ),
+                "previous": None,
+                "results": [
+                    {"name": str(index)}
+                    for index in range(start, min(start + page_size, num_results))
+                ],
+            },
+        )
+
+
+@pytest.mark.parametrize("ordered", [True, False])
+def test_parallel_paginated_results(requests_mock, ordered: bool):
+    _register_count_pages(requests_mock, num_results=25, page_size=3)
+    service = Service.objects.create(
+        api_type=APITypes.orc,
+        api_root=BOOK_API_ROOT,
+        auth_type=AuthTypes.no_auth,
+    )
+
+    with build_client(service) as client:
+        data = client.get("books", params={"page": 1, "ordering": "name"}).json()
+        all_data = list(parallel_pagination_helper(client, data, ordered=ordered))
+
+    expected = [{"name": str(index)} for index in range(25)]
+    if ordered:
+        assert all_data == expected
+    else:
+        assert sorted(all_data, key=lambda item: int(item["name"])) == expected
+    assert requests_mock.call_count == 9
+
+
+def test_parallel_paginated_results_max_requests(requests_mock):
+    _register_count_pages(requests_mock, num_results=25, page_size=3)
+    service = Service.objects.create(
+        api_type=APITypes.orc,
+        api_root=BOOK_API_ROOT,
+        auth_type=AuthTypes.no_auth,
+    )
+
+    with build_client(service) as client:
+        data = client.get("books", params={"page": 1, "ordering": "name"}).json()
+        all_data = list(parallel_pagination_helper(client, data, max_requests=2))
+
+    assert all_data == [{"name": str(index)} for index in range(9)]
+    assert requests_mock.call_count == 3
+
+
+def test_parallel_paginated_results_limits_pages_in_flight(requests_mock):
+    _register_count_pages(requests_mock, num_results=25, page_size=3)
+    service = Service.objects.create(
+        api_type=APITypes.orc,
+        api_root=BOOK_API_ROOT,
+        auth_type=AuthTypes.no_auth,
+    )
+
+    with build_client(service) as client:
+        data = client.get("books", params={"page": 1, "ordering": "name"}).json()
+        results = parallel_pagination_helper(client, data, max_workers=2)
+        # consume the first page and the first result of the second page
+        for _ in range(4):
+            next(results)
+
+        # the first page, and at most two pages ahead of the second one
+        assert requests_mock.call_count <= 4
+        results.close()
+
+
+def test_parallel_paginated_results_count_grew(requests_mock):
+    """
+    check that pages beyond the initial count are fetched sequentially
+    """
+    _register_count_pages(requests_mock, num_results=9, page_size=3)
+    data = {
+        "count": 6,
+        "next": f"{BOOK_API_ROOT}books?ordering=name&page=2",
+        "previous": None,
+        "results": [{"name": "0"}, {"name": "1"}, {"name": "2"}],
+    }
+    service = Service.objects.create(
+        api_type=APITypes.orc,
+        api_root=BOOK_API_ROOT,
+        auth_type=AuthTypes.no_auth,
+    )
+
+    with build_client(service) as client:
+        all_data = list(parallel_pagination_helper(client, data))
+
+    assert all_data == [{"name": str(index)} for index in range(9)]
+
+
+@pytest.mark.parametrize("gone_page", [{"status_code": 404}, {"json": {"results": []}}])
+def test_parallel_paginated_results_count_shrank(requests_mock, gone_page: dict):
+    """
+    check that fetching stops at the first page beyond the end of the collection
+    """
+    _register_count_pages(requests_mock, num_results=6, page_size=3)
+    for page in range(3, 6):
+        requests_mock.get(
+            f"{BOOK_API_ROOT}books?page={page}&ordering=name",
+            complete_qs=True,
+            **gone_page,
+        )
+    data = {
+        "count": 15,
+        "next": f"{BOOK_API_ROOT}books?ordering=name&page=2",
+        "previous": None,
+        "results": [{"name": "0"}, {"name": "1"}, {"name": "2"}],
+    }
+    service = Service.objects.create(
+        api_type=APITypes.orc,
+        api_root=BOOK_API_ROOT,
+        auth_type=AuthTypes.no_auth,
+    )
+
+    with build_client(service) as client:
+        all_data = list(parallel_pagination_helper(client, data, max_workers=1))
+
+    assert all_data == [{"name": str(index)} for index in range(6)]
+    # pages 2 and 3, not the pages after the one that is gone
+    assert requests_mock.call_count == 2
+
+
+def test_parallel_paginated_results_without_page_parameter(requests_mock):
+    """
+    check that endpoints without page numbers are fetched sequentially
+    """
+    requests_mock.get(
+        f"{BOOK_API_ROOT}books?cursor=abc",
+        complete_qs=True,
+        json={
+            "count": 2,
+            "next": None,
+            "previous": None,
+            "results": [{"name": "B"}],
+        },
+    )
+    data = {
+        "count": 2,
+        "next": f"{BOOK_API_ROOT}books?cursor=abc",
+        "previous": None,
+        "results": [{"name": "A"}],
+    }
+    service = Service.objects.create(
+        api_type=APITypes.orc,
+        api_root=BOOK_API_ROOT,
+        auth_type=AuthTypes.no_auth,
+    )
+
+    with build_client(service) as client:
+        all_data = list(parallel_pagination_helper(client, data))
+
+    assert all_data == [{"name": "A"}, {"name": "B"}]
+
+
+@dataclass
+class Book(Model):
+    name: str
+
+
+def test_model_paginated_results(requests_mock):
+    _register_pages(requests_mock, 3)
+    service = Service.objects.create(
+        api_type=APITypes.orc,
+        api_root=BOOK_API_ROOT,
+        auth_type=AuthTypes.no_auth,
+    )
+    client = build_client(service)
+    data = client.get("books", params={"page": 1}).json()
+
+    books = model_pagination_helper(client, data, Book)
+
+    assert list(books) == [Book(name="1"), Book(name="2"), Book(name="3")]
+
+
+def test_model_paginated_results_batches(requests_mock):
+    _register_pages(requests_mock, 5)
+    service = Service.objects.create(
+        api_type=APITypes.orc,
+        api_root=BOOK_API_ROOT,
+        auth_type=AuthTypes.no_auth,
+    )
+    client = build_client(service)
+    data = client.get("books", params={"page": 1}).json()
+
+    batches = model_pagination_helper(client, data, Book, batch_size=2)
+
+    assert next(batches) == [Book(name="1"), Book(name="2")]
+    # pages are only fetched while iterating
+    assert requests_mock.call_count == 2
+    assert list(batches) == [[Book(name="3"), Book(name="4")], [Book(name="5")]]
+
+
+def test_paginated_results_resume_from_cursor(requests_mock):
+    _register_count_pages(requests_mock, num_results=8, page_size=3)
+    service = Service.objects.create(
+        api_type=APITypes.orc,
+        api_root=BOOK_API_ROOT,
+        auth_type=AuthTypes.no_auth,
+    )
+    client = build_client(service)
+    data = client.get("books", params={"page": 1, "ordering": "name"}).json()
+    cursor = PaginationCursor()
+
+    # the crawl stops after processing the fifth result
+    processed = []
+    for result in pagination_helper(client, data, cursor=cursor):
+        processed.append(result)
+        if len(processed) == 5:
+            saved = cursor.to_dict()
+            break
+
+    assert saved == {
+        "page_url": f"{BOOK_API_ROOT}books?ordering=name&page=2",
+        "offset": 2,
+    }
+
+    cursor = PaginationCursor.from_dict(saved)
+    remaining = list(pagination_helper(client, None, cursor=cursor))
+
+    assert processed + remaining == [{"name": str(index)} for index in range(8)]
+    assert cursor == PaginationCursor(
+        page_url=f"{BOOK_API_ROOT}books?ordering=name&page=3", offset=2
+    )
+
+
+def test_paginated_results_requires_data_or_cursor():
+    with pytest.raises(ValueError):
+        pagination_helper(None, None, cursor=PaginationCursor())  # type: ignore
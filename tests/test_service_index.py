@@ -0,0 +1,124 @@
+from django.core.cache import cache
+
+import pytest
+from freezegun import freeze_time
+
+from zgw_consumers.models import Service
+from zgw_consumers.registry import (
+    VERSION_CACHE_KEY,
+    ServiceIndex,
+    get_snapshot_schema,
+    service_index,
+)
+from zgw_consumers.test.factories import ServiceFactory
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture(autouse=True)
+def enable_service_index(settings):
+    settings.SERVICE_INDEX_ENABLED = True
+    service_index.invalidate()
+    yield
+    service_index.invalidate()
+
+
+def test_get_service_longest_prefix_wins(django_assert_num_queries):
+    ServiceFactory.create(api_root="https://example.com/api/")
+    nested = ServiceFactory.create(api_root="https://example.com/api/v1/")
+    service_index.get_table()
+
+    with django_assert_num_queries(0):
+        service = Service.get_service("https://example.com/api/v1/zaken/123")
+
+    assert service == nested
+
+
+def test_get_service_no_match():
+    ServiceFactory.create(api_root="https://example.com/api/")
+
+    assert Service.get_service("https://example.com/other/1") is None
+    assert Service.get_service("https://other.example.com/api/1") is None
+
+
+def test_index_invalidated_on_save_and_delete():
+    assert Service.get_service("https://example.com/api/1") is None
+
+    service = ServiceFactory.create(api_root="https://example.com/api/")
+    assert Service.get_service("https://example.com/api/1") == service
+
+    service.delete()
+    assert Service.get_service("https://example.com/api/1") is None
+
+
+def test_index_hands_out_copies():
+    ServiceFactory.create(api_root="https://example.com/api/", label="Original")
+
+    service = Service.get_service("https://example.com/api/1")
+    assert service is not None
+    service.label = "Changed"
+
+    assert Service.get_service("https://example.com/api/1").label == "Original"  # type: ignore
+
+
+@pytest.fixture
+def shared_index(settings):
+    settings.SERVICE_INDEX_CACHE = "default"
+    cache.delete(VERSION_CACHE_KEY)
+    yield
+    cache.delete(VERSION_CACHE_KEY)
+
+
+@pytest.mark.usefixtures("shared_index")
+def test_shared_snapshot_avoids_queries_in_other_processes(
+    django_assert_num_queries,
+):
+    service = ServiceFactory.create(api_root="https://example.com/api/")
+    service_index.get_table()
+    # simulate another process with an empty index
+    other_index = ServiceIndex()
+
+    with django_assert_num_queries(0):
+        result = other_index.get_service("https://example.com/api/1")
+
+    assert result == service
+
+
+@pytest.mark.usefixtures("shared_index")
+def test_shared_version_bump_reloads_other_processes(settings):
+    settings.SERVICE_INDEX_CHECK_INTERVAL = 0
+    other_index = ServiceIndex()
+    assert other_index.get_service("https://example.com/api/1") is None
+
+    # the signal handler only clears the index of "this" process
+    service = ServiceFactory.create(api_root="https://example.com/api/")
+
+    assert other_index.get_service("https://example.com/api/1") == service
+
+
+@pytest.mark.usefixtures("shared_index")
+def test_shared_version_checked_after_interval(settings):
+    settings.SERVICE_INDEX_CHECK_INTERVAL = 5
+    with freeze_time() as frozen_time:
+        other_index = ServiceIndex()
+        assert other_index.get_service("https://example.com/api/1") is None
+
+        service = ServiceFactory.create(api_root="https://example.com/api/")
+
+        # the version is not checked again within the interval
+        assert other_index.get_service("https://example.com/api/1") is None
+
+        frozen_time.tick(5)
+        assert other_index.get_service("https://example.com/api/1") == service
+
+
+@pytest.mark.usefixtures("shared_index")
+def test_shared_snapshot_key_includes_schema():
+    service = ServiceFactory.create(api_root="https://example.com/api/")
+    service_index.get_table()
+    version = cache.get(VERSION_CACHE_KEY)
+
+    assert cache.get(f"zgw_consumers:service_index:{version}") is None
+    assert cache.get(
+        f"zgw_consumers:service_index:{get_snapshot_schema()}:{version}"
+    ) == [service]
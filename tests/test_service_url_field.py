@@ -1,3 +1,4 @@
+from django.db import connection
 from django.db.utils import IntegrityError
 
 import pytest
@@ -5,6 +6,7 @@ import pytest
 from testapp.models import Case
 from zgw_consumers.constants import APITypes
 from zgw_consumers.models import Service
+from zgw_consumers.models.lookups import In
 
 pytestmark = pytest.mark.django_db
 
@@ -103,6 +105,18 @@ def test_queryset_in():
     assert qs.get() == case1
 
 
+def test_queryset_in_generator():
+    Service.objects.create(api_type=APITypes.ztc, api_root=CASETYPE_API_ROOT)
+    case1 = Case.objects.create(casetype=f"{CASETYPE_API_ROOT}casetype/1")
+    Case.objects.create(casetype=f"{CASETYPE_API_ROOT}casetype/2")
+
+    qs = Case.objects.filter(
+        casetype__in=(f"{CASETYPE_API_ROOT}casetype/{i}" for i in [1, 3])
+    )
+
+    assert qs.get() == case1
+
+
 def test_queryset_in_no_base():
     Case.objects.create()
 
@@ -125,3 +139,44 @@ def test_queryset_subquery():
 
     assert qs.count() == 1
     assert qs.get() == service
+
+
+def test_queryset_in_resolves_services_once(django_assert_num_queries):
+    Service.objects.create(api_type=APITypes.ztc, api_root=CASETYPE_API_ROOT)
+    Case.objects.create(casetype=f"{CASETYPE_API_ROOT}casetype/1")
+    urls = [f"{CASETYPE_API_ROOT}casetype/{i}" for i in range(100)]
+
+    # one query to resolve the services, one for the count
+    with django_assert_num_queries(2):
+        count = Case.objects.filter(casetype__in=urls).count()
+
+    assert count == 1
+
+
+def test_queryset_in_large_list():
+    Service.objects.create(api_type=APITypes.ztc, api_root=CASETYPE_API_ROOT)
+    case1 = Case.objects.create(casetype=f"{CASETYPE_API_ROOT}casetype/1")
+    case2 = Case.objects.create(casetype=f"{CASETYPE_API_ROOT}casetype/999")
+    Case.objects.create(casetype=f"{CASETYPE_API_ROOT}casetype/1000")
+    urls = [f"{CASETYPE_API_ROOT}casetype/{i}" for i in range(1000)] + [
+        "https://unknown.example.org/casetype/1"
+    ]
+
+    qs = Case.objects.filter(casetype__in=urls)
+
+    assert set(qs) == {case1, case2}
+
+
+def test_queryset_in_chunked(monkeypatch):
+    Service.objects.create(api_type=APITypes.ztc, api_root=CASETYPE_API_ROOT)
+    case1 = Case.objects.create(casetype=f"{CASETYPE_API_ROOT}casetype/1")
+    case2 = Case.objects.create(casetype=f"{CASETYPE_API_ROOT}casetype/4")
+    urls = [f"{CASETYPE_API_ROOT}casetype/{i}" for i in range(5)]
+    # force the generic strategy with small IN clauses
+    monkeypatch.setattr(In, "postgres_unnest_threshold", None)
+    monkeypatch.setattr(connection.ops, "max_in_list_size", lambda: 2)
+
+    qs = Case.objects.filter(casetype__in=urls)
+
+    assert " OR " in str(qs.query)
+    assert set(qs) == {case1, case2}
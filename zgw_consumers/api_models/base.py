@@ -5,16 +5,18 @@ These are NOT django models.
 """
 
 import uuid
+from collections.abc import Callable
 from dataclasses import Field, fields
 from datetime import date, datetime
-from functools import partial
-from typing import Any, TypeVar, Union, overload
+from functools import cache, lru_cache, partial
+from types import UnionType
+from typing import Any, TypeVar, Union, get_args, get_origin, overload
 
 from dateutil.parser import parse
 from dateutil.relativedelta import relativedelta
 from relativedeltafield.utils import parse_relativedelta
 
-from ._camel_case import underscoreize
+from ._camel_case import camel_to_underscore, underscoreize
 from .types import JSONObject
 
 __all__ = ["CONVERTERS", "Model", "ZGWModel", "factory"]
@@ -46,43 +48,8 @@ class Model:
         self._type_cast()
 
     def _type_cast(self):
-        model_fields = get_model_fields(self)
-        for attr, field in model_fields.items():
-            typehint = field.type
-            value = getattr(self, attr)
-
-            if typehint is None:
-                typehint = type(None)
-
-            # support for Optional / List
-            if hasattr(typehint, "__origin__"):
-                if typehint.__origin__ is list and typehint.__args__:
-                    subtypehint = typehint.__args__[0]
-                    if issubclass(subtypehint, Model):
-                        setattr(self, attr, factory(subtypehint, value))
-                    else:
-                        converter = CONVERTERS[subtypehint]
-                        new_value = [converter(x) for x in value]
-                        setattr(self, attr, new_value)
-                    continue
-
-                if typehint.__origin__ is Union:
-                    typehint = typehint.__args__
-
-                    if value is None:
-                        continue
-
-                    # Optional is ONE type combined with None
-                    typehint = next(t for t in typehint if t is not None)
-
-            if isinstance(value, typehint):
-                continue
-
-            if issubclass(typehint, Model):
-                converter = partial(factory, typehint)
-            else:
-                converter = CONVERTERS[typehint]
-            setattr(self, attr, converter(value))
+        for attr, converter in get_converter_plan(type(self)):
+            setattr(self, attr, converter(getattr(self, attr)))
 
 
 M = TypeVar("M", bound=Model)
@@ -102,6 +69,72 @@ def get_model_fields(model: type | Model) -> dict[str, Field]:
     return {field.name: field for field in fields(model)}
 
 
+def _compile_converter(typehint: Any) -> Callable[[Any], Any] | None:
+    """
+    Build the function converting raw values to ``typehint``, or return ``None`` if
+    the values can be used as is.
+    """
+    if typehint is None:
+        typehint = type(None)
+
+    origin, args = get_origin(typehint), get_args(typehint)
+
+    # support for Optional / List
+    if origin is list and args:
+        subtypehint = args[0]
+        if issubclass(subtypehint, Model):
+            return partial(factory, subtypehint)
+        item_converter = CONVERTERS[subtypehint]
+        if item_converter is noop:
+            return None
+        return lambda value: [item_converter(x) for x in value]
+
+    if origin is Union or origin is UnionType:
+        # Optional is ONE type combined with None
+        converter = _compile_converter(next(t for t in args if t is not type(None)))
+        if converter is None:
+            return None
+        return lambda value: None if value is None else converter(value)
+
+    target = origin or typehint
+    if issubclass(target, Model):
+        converter = partial(factory, target)
+    elif target in CONVERTERS:
+        converter = CONVERTERS[target]
+        if converter is noop:
+            return None
+    else:
+        # only values that are not of the target type need a converter
+        def converter(value):
+            return CONVERTERS[target](value)
+
+    return lambda value: value if isinstance(value, target) else converter(value)
+
+
+@cache
+def get_converter_plan(model: type[Model]) -> tuple[tuple[str, Callable], ...]:
+    """
+    Return the ``(field name, converter)`` pairs of the fields of ``model`` whose
+    values must be converted. The plan is compiled once per model class.
+    """
+    plan = []
+    for attr, field in get_model_fields(model).items():
+        converter = _compile_converter(field.type)
+        if converter is not None:
+            plan.append((attr, converter))
+    return tuple(plan)
+
+
+@cache
+def get_known_kwargs(model: type[Model]) -> frozenset[str]:
+    return frozenset(get_model_fields(model))
+
+
+@lru_cache(maxsize=2048)
+def _underscoreize_key(key: str) -> str:
+    return camel_to_underscore(key)
+
+
 @overload
 def factory[M: Model](model: type[M], data: JSONObject) -> M: ...
 
@@ -115,14 +148,22 @@ def factory[M: Model](
 ) -> M | list[M]:
     _is_collection = isinstance(data, list)
 
-    model_fields = get_model_fields(model)
-    known_kwargs = list(model_fields.keys())
+    known_kwargs = get_known_kwargs(model)
 
     def _normalize(kwargs: dict):
         # TODO: this should be an explicit mapping, but *most* of the time with ZGW
         # API's this is fine.
-        kwargs = underscoreize(kwargs)
-        to_keep = {key: value for key, value in kwargs.items() if key in known_kwargs}
+        to_keep = {}
+        for key, value in kwargs.items():
+            name = _underscoreize_key(key) if isinstance(key, str) else key
+            if name not in known_kwargs:
+                continue
+            # nested objects are underscoreized too
+            to_keep[name] = (
+                value
+                if isinstance(value, str | int | float | None)
+                else underscoreize(value)
+            )
         return to_keep
 
     if not _is_collection:
@@ -0,0 +1,228 @@
+"""
+Asynchronous client for services, built on `httpx <https://www.python-httpx.org/>`_.
+
+The configuration of the :class:`zgw_consumers.models.Service` is extracted with the
+same :class:`zgw_consumers.client.ServiceConfigAdapter` as the synchronous clients use.
+
+Install the ``async`` extra to use this module: ``pip install zgw-consumers[async]``.
+"""
+
+import asyncio
+import logging
+import ssl
+from collections.abc import AsyncGenerator, Generator
+from typing import Any
+
+import httpx
+from ape_pie import InvalidURLError
+from asgiref.sync import sync_to_async
+from requests.auth import AuthBase
+
+from . import settings as zgw_settings
+from .client import OAuth2Auth, ServiceConfigAdapter, ZGWAuth
+from .models import Service
+from .nlx import is_json_content_type, rewrite_json_content, rewrite_table_cache
+
+logger = logging.getLogger(__name__)
+
+__all__ = ["AsyncServiceClient", "build_async_client"]
+
+
+class AsyncAuth(httpx.Auth):
+    """
+    Adapt the :class:`requests.auth.AuthBase` implementations of
+    :mod:`zgw_consumers.client` to :class:`httpx.Auth`.
+    """
+
+    def __init__(self, auth: AuthBase):
+        self.auth = auth
+
+    def sync_auth_flow(
+        self, request: httpx.Request
+    ) -> Generator[httpx.Request, httpx.Response, None]:
+        # the auth implementations only set headers on the request
+        self.auth(request)  # pyright: ignore[reportArgumentType]
+        yield request
+
+    async def async_auth_flow(
+        self, request: httpx.Request
+    ) -> AsyncGenerator[httpx.Request, httpx.Response]:
+        if isinstance(self.auth, OAuth2Auth):
+            # (re)fetching the token uses the cache and does blocking network I/O
+            await sync_to_async(self.auth, thread_sensitive=False)(request)  # pyright: ignore[reportArgumentType]
+        else:
+            self.auth(request)  # pyright: ignore[reportArgumentType]
+        yield request
+
+
+async def nlx_rewrite_async_hook(response: httpx.Response) -> None:
+    content_type = response.headers.get("Content-Type", "")
+    if not is_json_content_type(content_type):
+        return
+
+    await response.aread()
+    logger.debug(
+        "NLX client: Rewriting response JSON to replace outway URLs",
+        extra={"request": response.request},
+    )
+    table = await sync_to_async(rewrite_table_cache.get_table)()
+    response._content = rewrite_json_content(
+        response.content, response.charset_encoding, table.backwards
+    )
+
+
+class AsyncServiceClient(httpx.AsyncClient):
+    """
+    An :class:`httpx.AsyncClient` pinned to the API root of a service.
+
+    Relative URLs are joined with the API root, while absolute URLs must be contained
+    in the API root so that credentials don't leak to other hosts. Requests are routed
+    through the NLX outway if one is configured, and ZGW JWTs are regenerated once
+    when the service responds with HTTP 403. ``total_timeout`` limits the time to
+    receive the response (headers) of a request.
+    """
+
+    def __init__(
+        self, *, nlx_base_url: str = "", total_timeout: float | None = None, **kwargs
+    ):
+        super().__init__(**kwargs)
+        self.nlx_base_url = nlx_base_url
+        self.total_timeout = total_timeout
+
+        if self.nlx_base_url:
+            self.event_hooks["response"].insert(0, nlx_rewrite_async_hook)
+
+    def build_request(self, method: str, url: Any, **kwargs) -> httpx.Request:
+        base_url = str(self.base_url)
+        if (
+            isinstance(url, str | httpx.URL)
+            and httpx.URL(url).is_absolute_url
+            and not str(url).startswith(base_url)
+        ):
+            raise InvalidURLError(
+                f"Target URL {url} has a different base URL than the client "
+                f"({base_url})."
+            )
+        return super().build_request(method, url, **kwargs)
+
+    async def send(self, request: httpx.Request, **kwargs) -> httpx.Response:
+        if self.nlx_base_url:
+            # change the actual URL being called so that it uses NLX
+            request.url = httpx.URL(
+                str(request.url).replace(str(self.base_url), self.nlx_base_url, 1)
+            )
+
+        response = await self._send_with_deadline(request, **kwargs)
+
+        auth = self.auth
+        if response.status_code != 403 or not (
+            isinstance(auth, AsyncAuth) and isinstance(auth.auth, ZGWAuth)
+        ):
+            return response
+
+        await response.aclose()
+        auth.auth.refresh_token()
+
+        # Retry with the fresh credentials
+        return await self._send_with_deadline(request, **kwargs)
+
+    async def _send_with_deadline(
+        self, request: httpx.Request, **kwargs
+    ) -> httpx.Response:
+        try:
+            async with asyncio.timeout(self.total_timeout):
+                return await super().send(request, **kwargs)
+        except TimeoutError as exc:
+            raise httpx.TimeoutException(
+                f"Request exceeded the total timeout of {self.total_timeout}s",
+                request=request,
+            ) from exc
+
+
+def get_ssl_context(
+    verify: str | bool = True, cert: str | tuple[str, str] | None = None
+) -> ssl.SSLContext | bool:
+    """
+    Translate the ``verify`` and ``cert`` options of :mod:`requests` to an SSL context.
+    """
+    if verify is True and cert is None:
+        return True
+    if verify is False:
+        context = ssl.create_default_context()
+        context.check_hostname = False
+        context.verify_mode = ssl.CERT_NONE
+    else:
+        context = ssl.create_default_context(
+            cafile=verify if isinstance(verify, str) else None
+        )
+
+    if cert is not None:
+        if isinstance(cert, tuple):
+            context.load_cert_chain(*cert)
+        else:
+            context.load_cert_chain(cert)
+    return context
+
+
+def build_async_client(service: Service, **kwargs) -> AsyncServiceClient:
+    """
+    Build an async client for a given :class:`zgw_consumers.models.Service`.
+
+    Building the client may access the database (certificates) and the network (OAuth2
+    tokens), so wrap this in :func:`asgiref.sync.sync_to_async` when calling it from
+    async code. A single client can (and should) be shared by concurrent tasks, as they
+    then share its connection pool:
+
+    .. code-block:: python
+
+        client = await sync_to_async(build_async_client)(service)
+        async with client:
+            responses = await asyncio.gather(client.get("zaken"), client.get("rollen"))
+    """
+    session_kwargs = ServiceConfigAdapter(service).get_client_session_kwargs()
+
+    if (auth := session_kwargs.get("auth")) is not None:
+        kwargs.setdefault("auth", AsyncAuth(auth))
+
+    kwargs.setdefault(
+        "verify",
+        get_ssl_context(
+            verify=session_kwargs.get("verify", True), cert=session_kwargs.get("cert")
+        ),
+    )
+    # None means "no timeout" to httpx, so fall back to the timeout explicitly
+    kwargs.setdefault(
+        "timeout",
+        httpx.Timeout(
+            service.timeout,
+            connect=(
+                service.connect_timeout
+                if service.connect_timeout is not None
+                else service.timeout
+            ),
+            read=(
+                service.read_timeout
+                if service.read_timeout is not None
+                else service.timeout
+            ),
+        ),
+    )
+    kwargs.setdefault("total_timeout", service.total_timeout)
+
+    pool_maxsize = (
+        service.pool_maxsize
+        if service.pool_maxsize is not None
+        else zgw_settings.get_setting("CLIENT_POOL_MAXSIZE")
+    )
+    kwargs.setdefault(
+        "limits",
+        httpx.Limits(
+            # httpx waits for a free connection once the limit is reached
+            max_connections=pool_maxsize if service.pool_block else None,
+            max_keepalive_connections=pool_maxsize if service.keep_alive else 0,
+        ),
+    )
+
+    return AsyncServiceClient(
+        base_url=service.api_root, nlx_base_url=service.nlx, **kwargs
+    )
@@ -0,0 +1,104 @@
+"""
+Circuit breaker to stop sending requests to services that are down.
+
+After ``circuit_breaker_threshold`` consecutive failures (connection errors, timeouts
+or HTTP 5xx responses) the circuit of the service opens, and requests fail immediately
+with :class:`CircuitOpenError`. After ``circuit_breaker_reset_timeout`` seconds, the
+circuit is half-open: a single request is let through to probe the service. If it
+succeeds, the circuit closes again, otherwise it stays open for another period.
+
+The state is kept in the Django cache configured with the ``CIRCUIT_BREAKER_CACHE``
+setting, so that it is shared between processes when that cache is.
+"""
+
+import logging
+import time
+
+from django.core.cache import BaseCache, caches
+
+from requests.exceptions import ConnectionError
+
+from . import settings as zgw_settings
+from .models import Service
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitOpenError(ConnectionError):
+    """
+    The circuit of the service is open, the request was not sent.
+    """
+
+
+class CircuitBreaker:
+    def __init__(self, service: Service):
+        self.service_uuid = service.uuid
+        self.threshold = service.circuit_breaker_threshold
+        self.reset_timeout = service.circuit_breaker_reset_timeout
+
+        key_prefix = f"zgw_consumers:circuit_breaker:{self.service_uuid}"
+        self.failures_key = f"{key_prefix}:failures"
+        self.opened_at_key = f"{key_prefix}:opened_at"
+        self.probe_key = f"{key_prefix}:probe"
+
+    @property
+    def cache(self) -> BaseCache:
+        return caches[zgw_settings.get_setting("CIRCUIT_BREAKER_CACHE")]
+
+    def before_request(self) -> bool:
+        """
+        Check whether a request may be sent, raises :class:`CircuitOpenError` if not.
+
+        Returns whether the request probes a half-open circuit.
+        """
+        opened_at = self.cache.get(self.opened_at_key)
+        if opened_at is None:
+            return False
+
+        if time.time() < opened_at + self.reset_timeout:
+            raise CircuitOpenError(
+                f"The circuit of service {self.service_uuid} is open."
+            )
+        # half-open, only one request may probe the service
+        if not self.cache.add(self.probe_key, True, timeout=self.reset_timeout):
+            raise CircuitOpenError(
+                f"The circuit of service {self.service_uuid} is half-open."
+            )
+        return True
+
+    def record_success(self, probe: bool) -> None:
+        if probe:
+            logger.info("Closing the circuit of service %s", self.service_uuid)
+            self.cache.delete_many(
+                [self.opened_at_key, self.probe_key, self.failures_key]
+            )
+        elif self.cache.get(self.failures_key):
+            self.cache.delete(self.failures_key)
+
+    def record_failure(self, probe: bool) -> None:
+        if probe:
+            # the service is still down, open the circuit for another period
+            self._open()
+            self.cache.delete(self.probe_key)
+            return
+
+        try:
+            failures = self.cache.incr(self.failures_key)
+        except ValueError:
+            if self.cache.add(self.failures_key, 1, timeout=None):
+                failures = 1
+            else:
+                failures = self.cache.incr(self.failures_key)
+
+        # also reopen the circuit when its state was evicted from the cache while the
+        # failures were already past the threshold
+        if failures >= self.threshold:
+            self._open()
+
+    def _open(self) -> None:
+        logger.warning(
+            "Opening the circuit of service %s for %d seconds",
+            self.service_uuid,
+            self.reset_timeout,
+        )
+        self.cache.set(self.opened_at_key, time.time(), timeout=None)
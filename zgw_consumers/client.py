@@ -1,18 +1,32 @@
+import functools
+import hashlib
 import logging
+import math
+import threading
 import time
+from collections import OrderedDict
 from dataclasses import dataclass
-from typing import Any, TypeVar
+from typing import Any, TypeVar, cast
 
 from django.core.cache import cache
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
 
 import jwt
 from ape_pie import APIClient
+from requests.adapters import HTTPAdapter
 from requests.auth import AuthBase
-from requests.models import PreparedRequest
+from requests.exceptions import RequestException
+from requests.models import PreparedRequest, Response
+from requests.utils import default_headers
+from simple_certmanager.models import Certificate as BaseCertificate
+from urllib3.util import Retry, Timeout
 
+from zgw_consumers import settings as zgw_settings
 from zgw_consumers.constants import AuthTypes
-from zgw_consumers.models import Service
+from zgw_consumers.models import Certificate, Service
 
+from .circuit_breaker import CircuitBreaker
 from .nlx import NLXClient
 
 logger = logging.getLogger(__name__)
@@ -33,6 +47,163 @@ def build_client[ClientT: APIClient](
     )
 
 
+class PooledClientMixin:
+    """
+    Keep the connection pool of a long-lived client alive.
+
+    Clients handed out by :func:`get_client` are shared, so using them as a context
+    manager must not close the session and the session must not be closed after every
+    request outside of a context manager either.
+    """
+
+    _in_context_manager = True
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        pass
+
+
+@functools.cache
+def _get_pooled_client_class(client_factory: type[APIClient]) -> type[APIClient]:
+    return type(
+        f"Pooled{client_factory.__name__}", (PooledClientMixin, client_factory), {}
+    )
+
+
+def get_service_config_hash(service: Service) -> str:
+    """
+    Compute a hash of the configuration of a service, used to detect changes.
+    """
+    # compare the serialized values, an instance loaded from the database holds plain
+    # strings where an instance created in memory may hold e.g. enum members
+    values = tuple(
+        (field.attname, field.value_to_string(service))
+        for field in service._meta.fields
+        if field.concrete
+    )
+    return hashlib.sha256(repr(values).encode("utf-8")).hexdigest()
+
+
+class ClientPool:
+    """
+    Thread-safe registry of long-lived clients, one per service and client class.
+
+    A client is rebuilt when the configuration of its service changes.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._clients: dict[tuple[Any, type[APIClient]], tuple[str, APIClient]] = {}
+
+    def get[ClientT: APIClient](
+        self, service: Service, client_factory: type[ClientT] = NLXClient
+    ) -> ClientT:
+        if service.pk is None:
+            raise ValueError("Only saved services can have a pooled client.")
+
+        key = (service.pk, client_factory)
+        config_hash = get_service_config_hash(service)
+        if (entry := self._clients.get(key)) is not None and entry[0] == config_hash:
+            return entry[1]  # pyright: ignore[reportReturnType]
+
+        # building the client may involve network calls (OAuth2), so don't hold the
+        # lock while doing so
+        pooled_factory = cast(type[ClientT], _get_pooled_client_class(client_factory))
+        client = build_client(service, pooled_factory)
+
+        with self._lock:
+            entry = self._clients.get(key)
+            if entry is not None and entry[0] == config_hash:
+                # another thread was faster
+                client.close()
+                return entry[1]  # pyright: ignore[reportReturnType]
+            self._clients[key] = (config_hash, client)
+
+        if entry is not None:
+            entry[1].close()
+        return client
+
+    def discard(self, service_pk: Any) -> None:
+        with self._lock:
+            keys = [key for key in self._clients if key[0] == service_pk]
+            clients = [self._clients.pop(key)[1] for key in keys]
+        for client in clients:
+            client.close()
+
+    def clear(self) -> None:
+        with self._lock:
+            clients = [client for _, client in self._clients.values()]
+            self._clients.clear()
+        for client in clients:
+            client.close()
+
+
+client_pool = ClientPool()
+
+
+def get_client[ClientT: APIClient](
+    service: Service, client_factory: type[ClientT] = NLXClient
+) -> ClientT:
+    """
+    Get a long-lived, pooled client for a given :class:`zgw_consumers.models.Service`.
+
+    Unlike :func:`build_client`, the same client (and thus its connection pool) is
+    returned for the same service on subsequent calls, also from other threads. The
+    client is rebuilt when the service configuration changes. Using the client as a
+    context manager is supported, but does not close it.
+    """
+    return client_pool.get(service, client_factory)
+
+
+@receiver(post_delete, sender=Service, dispatch_uid="discard_pooled_client")
+def discard_pooled_client(sender, instance: Service, **kwargs) -> None:
+    client_pool.discard(instance.pk)
+
+
+@receiver(
+    [post_save, post_delete],
+    sender=BaseCertificate,
+    dispatch_uid="clear_client_pool_base_certificate",
+)
+@receiver(
+    [post_save, post_delete],
+    sender=Certificate,
+    dispatch_uid="clear_client_pool_certificate",
+)
+def clear_client_pool(sender, **kwargs) -> None:
+    # certificate files may have changed without the services changing
+    client_pool.clear()
+
+
+class ServiceHTTPAdapter(HTTPAdapter):
+    """
+    Transport adapter that guards the service with an (optional) circuit breaker.
+    """
+
+    def __init__(self, *args, circuit_breaker: CircuitBreaker | None = None, **kwargs):
+        self.circuit_breaker = circuit_breaker
+        super().__init__(*args, **kwargs)
+
+    def send(self, request: PreparedRequest, *args, **kwargs) -> Response:
+        if (circuit_breaker := self.circuit_breaker) is None:
+            return super().send(request, *args, **kwargs)
+
+        probe = circuit_breaker.before_request()
+        try:
+            response = super().send(request, *args, **kwargs)
+        except RequestException:
+            circuit_breaker.record_failure(probe)
+            raise
+
+        if response.status_code >= 500:
+            circuit_breaker.record_failure(probe)
+        else:
+            circuit_breaker.record_success(probe)
+        return response
+
+
 @dataclass
 class ServiceConfigAdapter:
     """
@@ -75,10 +246,88 @@ class ServiceConfigAdapter:
                 kwargs["auth"] = OAuth2Auth(service=self.service)
 
         # set timeout for the requests
-        kwargs["timeout"] = self.service.timeout
+        kwargs["timeout"] = self.get_timeout()
+
+        # the transport adapter of the service
+        adapter = self.get_http_adapter()
+        kwargs["adapters"] = OrderedDict([("https://", adapter), ("http://", adapter)])
+        if not self.service.keep_alive:
+            kwargs["headers"] = default_headers()
+            kwargs["headers"]["Connection"] = "close"
 
         return kwargs
 
+    def get_timeout(self) -> int | tuple[int, int] | Timeout:
+        """
+        Get the timeout for the requests, in a format that :mod:`requests` accepts.
+        """
+        service = self.service
+        connect = (
+            service.connect_timeout
+            if service.connect_timeout is not None
+            else service.timeout
+        )
+        read = (
+            service.read_timeout
+            if service.read_timeout is not None
+            else service.timeout
+        )
+
+        if service.total_timeout is not None:
+            return Timeout(connect=connect, read=read, total=service.total_timeout)
+        return connect if connect == read else (connect, read)
+
+    def get_http_adapter(self) -> HTTPAdapter:
+        """
+        Build the transport adapter with the connection pool settings of the service.
+        """
+        pool_connections = self.service.pool_connections
+        pool_maxsize = self.service.pool_maxsize
+        return ServiceHTTPAdapter(
+            circuit_breaker=(
+                CircuitBreaker(self.service)
+                if self.service.circuit_breaker_threshold
+                else None
+            ),
+            pool_connections=(
+                pool_connections
+                if pool_connections is not None
+                else zgw_settings.get_setting("CLIENT_POOL_CONNECTIONS")
+            ),
+            pool_maxsize=(
+                pool_maxsize
+                if pool_maxsize is not None
+                else zgw_settings.get_setting("CLIENT_POOL_MAXSIZE")
+            ),
+            pool_block=self.service.pool_block,
+            max_retries=self.get_retry(),
+        )
+
+    def get_retry(self) -> Retry | int:
+        """
+        Build the retry policy of the service.
+        """
+        service = self.service
+        if not service.max_retries:
+            # the default of requests, which doesn't retry at all
+            return 0
+
+        status_codes = [
+            int(code) for code in service.retry_status_codes.split(",") if code
+        ]
+        return Retry(
+            total=service.max_retries,
+            status_forcelist=status_codes,
+            allowed_methods=(
+                Retry.DEFAULT_ALLOWED_METHODS if service.retry_idempotent_only else None
+            ),
+            backoff_factor=service.retry_backoff_factor,
+            backoff_jitter=service.retry_backoff_jitter,
+            respect_retry_after_header=service.retry_respect_retry_after,
+            # hand the last response to the caller instead of raising an exception
+            raise_on_status=False,
+        )
+
 
 @dataclass
 class APIKeyAuth(AuthBase):
@@ -92,38 +341,200 @@ class APIKeyAuth(AuthBase):
         return request
 
 
+def get_jwt_cache_key(service: Service) -> tuple[Any, ...]:
+    # include the secret (hashed), so that changing it invalidates the cached tokens
+    secret_hash = hashlib.sha256(service.secret.encode("utf-8")).hexdigest()
+    return (
+        service.uuid,
+        service.client_id,
+        service.user_id,
+        service.user_representation,
+        service.jwt_valid_for,
+        secret_hash,
+    )
+
+
+class JWTCache:
+    """
+    Process-wide cache of signed ZGW JWTs, shared by all :class:`ZGWAuth` instances.
+
+    Tokens are renewed ``ZGW_JWT_RENEWAL_MARGIN`` seconds before they expire, so that
+    clients never send an expired token.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._tokens: dict[tuple[Any, ...], tuple[str, int]] = {}
+
+    def get_token(
+        self, service: Service, key: tuple[Any, ...] | None = None, refresh=False
+    ) -> tuple[str, int]:
+        """
+        Get a signed token for the service and the time at which it must be renewed.
+        """
+        if key is None:
+            key = get_jwt_cache_key(service)
+        entry = self._tokens.get(key)
+        if not refresh and entry is not None and time.time() < entry[1]:
+            return entry
+
+        token, exp = generate_jwt(service)
+        # renew halfway through the validity of short-lived tokens
+        margin = min(
+            zgw_settings.get_setting("ZGW_JWT_RENEWAL_MARGIN"),
+            service.jwt_valid_for // 2,
+        )
+        entry = (token, exp - margin)
+        with self._lock:
+            self._tokens[key] = entry
+        return entry
+
+    def discard(self, service_uuid: Any) -> None:
+        with self._lock:
+            for key in [key for key in self._tokens if key[0] == service_uuid]:
+                del self._tokens[key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._tokens.clear()
+
+
+jwt_cache = JWTCache()
+
+
+def generate_jwt(service: Service) -> tuple[str, int]:
+    """
+    Sign a ZGW JWT for the service, returns the token and its expiry timestamp.
+    """
+    iat = int(time.time())
+    exp = iat + service.jwt_valid_for
+    payload = {
+        # standard claims
+        "iss": service.client_id,
+        "iat": iat,
+        "exp": exp,
+        # custom claims
+        "client_id": service.client_id,
+        "user_id": service.user_id,
+        "user_representation": service.user_representation,
+    }
+
+    return jwt.encode(payload, service.secret, algorithm="HS256"), exp
+
+
 @dataclass
 class ZGWAuth(AuthBase):
     """
     :class:`requests.auth.AuthBase` implementation for ZGW APIs auth.
+
+    Signed tokens are shared through :data:`jwt_cache` and renewed before they expire.
     """
 
     service: Service
 
     def __post_init__(self):
-        self._token = self._generate_token()
-
-    def _generate_token(self) -> str:
-        iat = int(time.time())
-        payload = {
-            # standard claims
-            "iss": self.service.client_id,
-            "iat": iat,
-            "exp": iat + self.service.jwt_valid_for,
-            # custom claims
-            "client_id": self.service.client_id,
-            "user_id": self.service.user_id,
-            "user_representation": self.service.user_representation,
-        }
-
-        return jwt.encode(payload, self.service.secret, algorithm="HS256")
+        self._cache_key = get_jwt_cache_key(self.service)
+        self._token, self._renew_at = jwt_cache.get_token(
+            self.service, key=self._cache_key
+        )
 
     def __call__(self, request: PreparedRequest):
+        if time.time() >= self._renew_at:
+            self._token, self._renew_at = jwt_cache.get_token(
+                self.service, key=self._cache_key
+            )
         request.headers["Authorization"] = f"Bearer {self._token}"
         return request
 
     def refresh_token(self):
-        self._token = self._generate_token()
+        self._token, self._renew_at = jwt_cache.get_token(
+            self.service, key=self._cache_key, refresh=True
+        )
+
+
+TOKEN_POLL_INTERVAL = 0.1  # seconds
+
+
+def get_token_refresh_at(token: dict[str, Any]) -> float:
+    """
+    Get the timestamp at which an OAuth2 token should be refreshed.
+
+    Tokens are refreshed early, after ``OAUTH2_TOKEN_REFRESH_FRACTION`` of their
+    lifetime. Tokens without an expiry are never refreshed.
+    """
+    if not (expires_at := token.get("expires_at")):
+        return math.inf
+    if not (expires_in := token.get("expires_in")):
+        return expires_at
+    fraction = zgw_settings.get_setting("OAUTH2_TOKEN_REFRESH_FRACTION")
+    return expires_at - expires_in * (1 - fraction)
+
+
+def get_oauth2_token_cache_key(service: Service) -> str:
+    # include the credentials and scope (hashed), so that changing them invalidates
+    # the cached tokens
+    config_hash = hashlib.sha256(
+        repr(
+            (
+                service.oauth2_token_url,
+                service.client_id,
+                service.secret,
+                service.oauth2_scope,
+            )
+        ).encode("utf-8")
+    ).hexdigest()
+    return f"oauth2_token:{service.uuid}:{config_hash}"
+
+
+class OAuth2TokenCache:
+    """
+    Process-local cache of OAuth2 tokens, in front of the Django cache.
+
+    Tokens are only handed out until they are due for a refresh (or until
+    ``valid_until``), after that the Django cache (and the refresh lease in it) is
+    consulted again. The tokens of a service are discarded when it is saved or deleted.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._tokens: dict[tuple[Any, str], tuple[dict[str, Any], float]] = {}
+
+    def get(self, key: tuple[Any, str]) -> dict[str, Any] | None:
+        entry = self._tokens.get(key)
+        if entry is not None and time.time() < entry[1]:
+            return entry[0]
+        return None
+
+    def set(
+        self,
+        key: tuple[Any, str],
+        token: dict[str, Any],
+        valid_until: float | None = None,
+    ) -> None:
+        if valid_until is None:
+            valid_until = get_token_refresh_at(token)
+        with self._lock:
+            self._tokens[key] = (token, valid_until)
+
+    def discard(self, service_uuid: Any) -> None:
+        with self._lock:
+            for key in [key for key in self._tokens if key[0] == service_uuid]:
+                del self._tokens[key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._tokens.clear()
+
+
+oauth2_token_cache = OAuth2TokenCache()
+
+
+@receiver(
+    [post_save, post_delete], sender=Service, dispatch_uid="discard_cached_tokens"
+)
+def discard_cached_tokens(sender, instance: Service, **kwargs) -> None:
+    jwt_cache.discard(instance.uuid)
+    oauth2_token_cache.discard(instance.uuid)
 
 
 @dataclass
@@ -139,36 +550,105 @@ class OAuth2Auth(AuthBase):
 
     def _fetch_token(self) -> None:
         """
-        Request a new access token using client credentials and add it to the cache.
+        Get the access token from the (process-local or Django) cache, or request a
+        new one.
+
+        Only one process at a time requests a new token for a service, using a lease in
+        the cache. The others keep using the cached token while it's still valid, or
+        wait for the new token otherwise.
         """
-        from oauthlib.oauth2 import BackendApplicationClient
-        from requests_oauthlib import OAuth2Session
+        cache_key = get_oauth2_token_cache_key(self.service)
+        local_key = (self.service.uuid, cache_key)
+        if token := oauth2_token_cache.get(local_key):
+            self._token = token
+            return
 
-        cache_key = f"oauth2_token:{self.service.uuid}"
         cached = cache.get(cache_key)
-        if cached:
+        if cached and time.time() < get_token_refresh_at(cached):
+            oauth2_token_cache.set(local_key, cached)
+            self._token = cached
+            return
+
+        lock_key = f"{cache_key}:lock"
+        lock_timeout = zgw_settings.get_setting("OAUTH2_TOKEN_LOCK_TIMEOUT")
+        has_lock = cache.add(lock_key, True, timeout=lock_timeout)
+        if not has_lock:
+            if cached:
+                # another process is refreshing the token early, keep using this one
+                # until the new token should be in the cache
+                valid_until = time.time() + lock_timeout
+                if expires_at := cached.get("expires_at"):
+                    valid_until = min(valid_until, expires_at)
+                oauth2_token_cache.set(local_key, cached, valid_until=valid_until)
+                self._token = cached
+                return
+            if token := self._wait_for_token(cache_key, lock_key, lock_timeout):
+                oauth2_token_cache.set(local_key, token)
+                self._token = token
+                return
+            logger.warning(
+                "Timed out waiting for the OAuth2 token to be fetched",
+                extra={"service": self.service.uuid},
+            )
+
+        try:
+            token = self._request_token()
+        except Exception:
+            if not cached:
+                raise
+            logger.warning(
+                "Refreshing the OAuth2 token failed, using the current token",
+                exc_info=True,
+                extra={"service": self.service.uuid},
+            )
             self._token = cached
             return
+        finally:
+            if has_lock:
+                cache.delete(lock_key)
+
+        # keep the token in the cache until (just before) it expires, to allow other
+        # processes to use it while it's being refreshed
+        ttl = token.get("expires_in")
+        timeout = max(ttl - 10, 1) if ttl else None
+        cache.set(cache_key, token, timeout=timeout)
+        oauth2_token_cache.set(local_key, token)
+        self._token = token
+
+    def _wait_for_token(
+        self, cache_key: str, lock_key: str, timeout: float
+    ) -> dict[str, Any] | None:
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            time.sleep(TOKEN_POLL_INTERVAL)
+            if token := cache.get(cache_key):
+                return token
+            if not cache.get(lock_key):
+                # the other process failed to fetch the token
+                return None
+        return None
+
+    def _request_token(self) -> dict[str, Any]:
+        """
+        Request a new access token using client credentials.
+        """
+        from oauthlib.oauth2 import BackendApplicationClient
+        from requests_oauthlib import OAuth2Session
 
         client = BackendApplicationClient(
             client_id=self.service.client_id, scope=self.service.oauth2_scope
         )
 
         with OAuth2Session(client=client) as session:
-            self._token = session.fetch_token(
+            return session.fetch_token(
                 token_url=self.service.oauth2_token_url,
                 client_id=self.service.client_id,
                 client_secret=self.service.secret,
             )
 
-        # Determine TTL based on token's `expires_in`
-        ttl = self._token.get("expires_in", 1)
-        timeout = ttl - 10 if ttl > 10 else None
-        cache.set(cache_key, self._token, timeout=timeout)
-
     def _ensure_valid_token(self) -> None:
-        """Refresh token if expired."""
-        if not self._token or self._token.get("expires_at", 0) <= time.time():
+        """Refresh token if it (almost) expired."""
+        if not self._token or get_token_refresh_at(self._token) <= time.time():
             self._fetch_token()
 
     def __call__(self, request: PreparedRequest) -> PreparedRequest:
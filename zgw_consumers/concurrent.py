@@ -1,13 +1,25 @@
 """
-Wrap around concurrent.futures to add Django-specific cleanup behaviour.
+Wrap around concurrent.futures and asyncio to add Django-specific cleanup behaviour.
 """
 
+import asyncio
+import contextlib
 import functools
+import inspect
 import logging
+import os
 import threading
+from collections import deque
+from collections.abc import Awaitable, Callable, Iterable
 from concurrent import futures
+from typing import Any
 
 from django.db import connections
+from django.db.backends.base.base import BaseDatabaseWrapper
+
+from asgiref.sync import sync_to_async
+
+from . import settings as zgw_settings
 
 logger = logging.getLogger(__name__)
 
@@ -24,9 +36,67 @@ def close_db_connections():
     connections.close_all()
 
 
-def wrap_fn(fn):
+def get_open_connections() -> list[BaseDatabaseWrapper]:
+    """
+    Get the database connections that the current thread has open.
+    """
+    return [
+        conn
+        for conn in connections.all(initialized_only=True)
+        if conn.connection is not None
+    ]
+
+
+class ConnectionTracker:
     """
-    Closes the database connections when the original function has completed.
+    Keep track of the database connections that worker threads leave open.
+
+    Connections are thread-local, so they can only be closed from another thread once
+    the worker threads are done with them, e.g. after the pool was shut down.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._connections: dict[int, BaseDatabaseWrapper] = {}
+
+    def add(self, conns: Iterable[BaseDatabaseWrapper]) -> None:
+        with self._lock:
+            self._connections.update((id(conn), conn) for conn in conns)
+
+    def close_all(self) -> None:
+        with self._lock:
+            conns = list(self._connections.values())
+            self._connections.clear()
+
+        for conn in conns:
+            conn.inc_thread_sharing()
+            try:
+                conn.close()
+            finally:
+                conn.dec_thread_sharing()
+
+    def close_current_thread(self) -> None:
+        """
+        Close the connections of the current thread, e.g. when it goes idle.
+        """
+        conns = get_open_connections()
+        with self._lock:
+            for conn in conns:
+                self._connections.pop(id(conn), None)
+
+        for conn in conns:
+            conn.close()
+
+
+def wrap_fn(fn, tracker: ConnectionTracker | None = None):
+    """
+    Clean up the database connections when the original function has completed.
+
+    Nothing is done if the function did not use the database. Without a ``tracker``,
+    all the connections of the worker thread are closed. With a ``tracker``, only the
+    connections that are unusable or have exceeded their ``CONN_MAX_AGE`` are closed,
+    the others are reused by the next function on the same thread and are added to the
+    tracker to be closed when the pool shuts down.
     """
 
     @functools.wraps(fn)
@@ -34,18 +104,187 @@ def wrap_fn(fn):
         try:
             return fn(*fn_args, **fn_kwargs)
         finally:
-            logger.debug(
-                "Closing all database connections",
-                extra={"thread_id": threading.get_ident()},
-            )
-            close_db_connections()
+            if open_connections := get_open_connections():
+                if tracker is None:
+                    logger.debug(
+                        "Closing all database connections",
+                        extra={"thread_id": threading.get_ident()},
+                    )
+                    close_db_connections()
+                else:
+                    for conn in open_connections:
+                        conn.close_if_unusable_or_obsolete()
+                    tracker.add(get_open_connections())
 
     return wrapped
 
 
+_shared_executor: futures.ThreadPoolExecutor | None = None
+_shared_executor_lock = threading.Lock()
+
+
+def get_shared_executor() -> futures.ThreadPoolExecutor:
+    """
+    Get the process-wide thread pool, sized with the ``PARALLEL_SHARED_POOL_SIZE``
+    setting.
+    """
+    global _shared_executor
+    with _shared_executor_lock:
+        if _shared_executor is None:
+            _shared_executor = futures.ThreadPoolExecutor(
+                max_workers=zgw_settings.get_setting("PARALLEL_SHARED_POOL_SIZE"),
+                thread_name_prefix="zgw_consumers",
+            )
+        return _shared_executor
+
+
+# the connections of the shared pool are closed when its worker threads go idle
+_shared_connections = ConnectionTracker()
+
+# marks the worker threads of the shared pool while they run a call
+_shared_worker = threading.local()
+
+
+def _reset_shared_executor() -> None:
+    # the worker threads don't survive a fork, the child process must start a new pool
+    global _shared_executor, _shared_executor_lock, _shared_connections
+    _shared_executor = None
+    _shared_executor_lock = threading.Lock()
+    _shared_connections = ConnectionTracker()
+
+
+os.register_at_fork(after_in_child=_reset_shared_executor)
+
+
+class SharedPoolExecutor(futures.Executor):
+    """
+    Borrow at most ``max_workers`` threads of a shared thread pool.
+
+    Calls that exceed the limit are queued and dispatched to the pool as soon as one of
+    the running calls completes. Shutting down only waits for (or cancels) the calls
+    that were submitted through this instance, the shared pool itself keeps running.
+
+    Calls submitted from a worker thread of the shared pool (i.e. nested blocks) run
+    inline in that thread. Waiting for them in the (bounded) pool could otherwise
+    deadlock when all its threads are waiting for nested calls.
+    """
+
+    def __init__(
+        self, executor: futures.ThreadPoolExecutor, max_workers: int | None = None
+    ):
+        if max_workers is not None and max_workers <= 0:
+            raise ValueError("max_workers must be greater than 0")
+        self._executor = executor
+        self._max_workers = max_workers
+        self._lock = threading.Lock()
+        self._running = 0
+        self._pending: deque[tuple[futures.Future, Callable[[], Any]]] = deque()
+        self._futures: list[futures.Future] = []
+        self._shutdown = False
+
+    def submit(self, fn, /, *args, **kwargs) -> futures.Future:
+        future = futures.Future()
+        call = functools.partial(fn, *args, **kwargs)
+        with self._lock:
+            if self._shutdown:
+                raise RuntimeError("cannot schedule new futures after shutdown")
+            self._futures.append(future)
+            in_worker = getattr(_shared_worker, "active", False)
+            if not in_worker:
+                if self._max_workers is not None and self._running >= self._max_workers:
+                    self._pending.append((future, call))
+                    return future
+                self._running += 1
+
+        if in_worker:
+            self._call(future, call)
+        else:
+            self._dispatch(future, call)
+        return future
+
+    def _dispatch(self, future: futures.Future, call: Callable[[], Any]) -> None:
+        try:
+            self._executor.submit(self._run, future, call)
+        except BaseException as exc:
+            # resolve the future, or shutting down would wait for it forever
+            if future.set_running_or_notify_cancel():
+                future.set_exception(exc)
+            self._release()
+            raise
+
+    def _run(self, future: futures.Future, call: Callable[[], Any]) -> None:
+        _shared_worker.active = True
+        try:
+            self._call(future, call)
+        finally:
+            _shared_worker.active = False
+            self._release()
+            # don't keep the connections of an idle worker thread open, possibly long
+            # after their CONN_MAX_AGE
+            if self._executor._work_queue.empty():
+                _shared_connections.close_current_thread()
+
+    @staticmethod
+    def _call(future: futures.Future, call: Callable[[], Any]) -> None:
+        # skip calls that were cancelled while they were queued
+        if not future.set_running_or_notify_cancel():
+            return
+        try:
+            result = call()
+        except BaseException as exc:  # noqa: BLE001 - like ThreadPoolExecutor
+            future.set_exception(exc)
+        else:
+            future.set_result(result)
+
+    def _release(self) -> None:
+        with self._lock:
+            if not self._pending:
+                self._running -= 1
+                return
+            future, call = self._pending.popleft()
+        self._dispatch(future, call)
+
+    def shutdown(self, wait: bool = True, *, cancel_futures: bool = False) -> None:
+        with self._lock:
+            self._shutdown = True
+            submitted = list(self._futures)
+
+        if cancel_futures:
+            for future in submitted:
+                future.cancel()
+
+        if wait:
+            futures.wait(submitted)
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        # nobody is going to collect the results of calls that did not start yet
+        self.shutdown(wait=True, cancel_futures=exc_type is not None)
+        return False
+
+
 class parallel:
-    def __init__(self, **kwargs):
-        self.executor = futures.ThreadPoolExecutor(**kwargs)
+    """
+    Wrap :class:`concurrent.futures.ThreadPoolExecutor` to clean up the database
+    connections of the worker threads.
+
+    With ``shared=True``, the block borrows threads from the process-wide pool of
+    :func:`get_shared_executor` instead of starting (and stopping) a pool of its own.
+    ``max_workers`` then limits how many calls of the block run at the same time, and
+    calls that did not start yet are cancelled when the block exits with an exception.
+
+    Database connections are reused by the calls on the same thread (respecting
+    ``CONN_MAX_AGE``). Those of a block's own pool are closed when the block exits,
+    those of the shared pool when its worker thread runs out of work.
+    """
+
+    def __init__(self, *, shared: bool = False, **kwargs):
+        self.shared = shared
+        if shared:
+            self.executor = SharedPoolExecutor(get_shared_executor(), **kwargs)
+            self.tracker = _shared_connections
+        else:
+            self.executor = futures.ThreadPoolExecutor(**kwargs)
+            self.tracker = ConnectionTracker()
 
     def submit(self, *args, **kwargs):
         if len(args) >= 1:
@@ -55,17 +294,93 @@ class parallel:
         else:
             raise TypeError("Invalid signature")
 
-        fn = wrap_fn(_fn)
+        fn = wrap_fn(_fn, self.tracker)
 
         return self.executor.submit(fn, *args, **kwargs)
 
     def map(self, fn, *iterables, timeout=None, chunksize=1):
         return self.executor.map(
-            wrap_fn(fn), *iterables, timeout=timeout, chunksize=chunksize
+            wrap_fn(fn, self.tracker), *iterables, timeout=timeout, chunksize=chunksize
         )
 
     def __enter__(self):
         return self
 
     def __exit__(self, exc_type, exc_val, exc_tb):
-        return self.executor.__exit__(exc_type, exc_val, exc_tb)
+        try:
+            return self.executor.__exit__(exc_type, exc_val, exc_tb)
+        finally:
+            # the worker threads have been joined, so their connections can be closed
+            if not self.shared:
+                self.tracker.close_all()
+
+
+async def run_in_thread[T](fn: Callable[..., T], /, *args, **kwargs) -> T:
+    """
+    Run a sync callable in a worker thread of the event loop's default executor.
+
+    The worker threads live as long as the event loop, so the database connections
+    that the call opened are closed when it completes, regardless of ``CONN_MAX_AGE``.
+    """
+    return await sync_to_async(wrap_fn(fn), thread_sensitive=False)(*args, **kwargs)
+
+
+async def gather_limited(
+    *aws: Awaitable[Any], limit: int, return_exceptions: bool = False
+) -> list[Any]:
+    """
+    Like :func:`asyncio.gather`, but await at most ``limit`` awaitables at a time.
+    """
+    semaphore = asyncio.Semaphore(limit)
+
+    async def _limited(aw: Awaitable[Any]):
+        async with semaphore:
+            return await aw
+
+    return await asyncio.gather(
+        *(_limited(aw) for aw in aws), return_exceptions=return_exceptions
+    )
+
+
+class aparallel:
+    """
+    Asyncio counterpart of :class:`parallel`, with an optional concurrency limit.
+
+    Coroutine functions are awaited directly, sync callables are run in a thread with
+    :func:`run_in_thread`. Leaving the block waits for all the submitted tasks. If one
+    of them fails, the others are cancelled.
+
+    .. code-block:: python
+
+        async with aparallel(max_concurrency=10) as executor:
+            zaken = executor.submit(client.get, "zaken")
+            rollen = executor.submit(some_sync_function, "rollen")
+
+        zaken.result(), rollen.result()
+    """
+
+    def __init__(self, max_concurrency: int | None = None):
+        self._semaphore = (
+            asyncio.Semaphore(max_concurrency) if max_concurrency is not None else None
+        )
+        self._task_group = asyncio.TaskGroup()
+
+    async def _run(self, fn: Callable[..., Any], *args, **kwargs):
+        async with self._semaphore or contextlib.nullcontext():
+            if inspect.iscoroutinefunction(fn):
+                return await fn(*args, **kwargs)
+            return await run_in_thread(fn, *args, **kwargs)
+
+    def submit(self, fn: Callable[..., Any], /, *args, **kwargs) -> asyncio.Task:
+        return self._task_group.create_task(self._run(fn, *args, **kwargs))
+
+    async def map(self, fn: Callable[..., Any], *iterables) -> list[Any]:
+        tasks = [self.submit(fn, *args) for args in zip(*iterables, strict=False)]
+        return [await task for task in tasks]
+
+    async def __aenter__(self):
+        await self._task_group.__aenter__()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        return await self._task_group.__aexit__(exc_type, exc_val, exc_tb)
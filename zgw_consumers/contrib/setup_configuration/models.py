@@ -32,6 +32,21 @@ class SingleServiceConfigurationModel(ConfigurationModel):
                 "user_id",
                 "user_representation",
                 "timeout",
+                "connect_timeout",
+                "read_timeout",
+                "total_timeout",
+                "pool_connections",
+                "pool_maxsize",
+                "pool_block",
+                "keep_alive",
+                "max_retries",
+                "retry_backoff_factor",
+                "retry_backoff_jitter",
+                "retry_status_codes",
+                "retry_idempotent_only",
+                "retry_respect_retry_after",
+                "circuit_breaker_threshold",
+                "circuit_breaker_reset_timeout",
                 "jwt_valid_for",
                 "oauth2_token_url",
                 "oauth2_scope",
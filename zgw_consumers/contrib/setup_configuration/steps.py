@@ -35,6 +35,23 @@ class ServiceConfigurationStep(BaseConfigurationStep[ServicesConfigurationModel]
                     "user_id": config.user_id,  # type: ignore setup_configuration pydantic meta programming
                     "user_representation": config.user_representation,  # type: ignore setup_configuration pydantic meta programming
                     "timeout": config.timeout,  # type: ignore setup_configuration pydantic meta programming
+                    "connect_timeout": config.connect_timeout,  # type: ignore setup_configuration pydantic meta programming
+                    "read_timeout": config.read_timeout,  # type: ignore setup_configuration pydantic meta programming
+                    "total_timeout": config.total_timeout,  # type: ignore setup_configuration pydantic meta programming
+                    "pool_connections": config.pool_connections,  # type: ignore setup_configuration pydantic meta programming
+                    "pool_maxsize": config.pool_maxsize,  # type: ignore setup_configuration pydantic meta programming
+                    "pool_block": config.pool_block,  # type: ignore setup_configuration pydantic meta programming
+                    "keep_alive": config.keep_alive,  # type: ignore setup_configuration pydantic meta programming
+                    "max_retries": config.max_retries,  # type: ignore setup_configuration pydantic meta programming
+                    "retry_backoff_factor": config.retry_backoff_factor,  # type: ignore setup_configuration pydantic meta programming
+                    "retry_backoff_jitter": config.retry_backoff_jitter,  # type: ignore setup_configuration pydantic meta programming
+                    "retry_status_codes": config.retry_status_codes,  # type: ignore setup_configuration pydantic meta programming
+                    "retry_idempotent_only": config.retry_idempotent_only,  # type: ignore setup_configuration pydantic meta programming
+                    "retry_respect_retry_after": config.retry_respect_retry_after,  # type: ignore setup_configuration pydantic meta programming
+                    "circuit_breaker_threshold": config.circuit_breaker_threshold,  # type: ignore setup_configuration pydantic meta programming
+                    "circuit_breaker_reset_timeout": (
+                        config.circuit_breaker_reset_timeout  # type: ignore setup_configuration pydantic meta programming
+                    ),
                     "jwt_valid_for": config.jwt_valid_for,  # type: ignore setup_configuration pydantic meta programming
                     "oauth2_token_url": config.oauth2_token_url,  # type: ignore setup_configuration pydantic meta programming
                     "oauth2_scope": config.oauth2_scope,  # type: ignore setup_configuration pydantic meta programming
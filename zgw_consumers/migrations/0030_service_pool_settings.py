@@ -0,0 +1,63 @@
+# Generated by Django 5.2.7 on 2026-10-18 09:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("zgw_consumers", "0029_alter_nlxconfig_certificate_and_more"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="service",
+            name="keep_alive",
+            field=models.BooleanField(
+                default=True,
+                help_text=(
+                    "Reuse connections for subsequent requests. If disabled, "
+                    "connections are closed after every request."
+                ),
+                verbose_name="keep connections alive",
+            ),
+        ),
+        migrations.AddField(
+            model_name="service",
+            name="pool_block",
+            field=models.BooleanField(
+                default=False,
+                help_text=(
+                    "Wait for a connection to become available when all connections "
+                    "of the pool are in use, instead of opening an extra connection "
+                    "that is discarded afterwards."
+                ),
+                verbose_name="block when pool is full",
+            ),
+        ),
+        migrations.AddField(
+            model_name="service",
+            name="pool_connections",
+            field=models.PositiveSmallIntegerField(
+                blank=True,
+                help_text=(
+                    "Number of connection pools (one per host) to cache. Leave empty "
+                    "to use the default."
+                ),
+                null=True,
+                verbose_name="connection pools",
+            ),
+        ),
+        migrations.AddField(
+            model_name="service",
+            name="pool_maxsize",
+            field=models.PositiveSmallIntegerField(
+                blank=True,
+                help_text=(
+                    "Maximum number of connections to keep open per host. Leave empty "
+                    "to use the default."
+                ),
+                null=True,
+                verbose_name="maximum connections per pool",
+            ),
+        ),
+    ]
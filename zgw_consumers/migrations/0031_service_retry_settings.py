@@ -0,0 +1,90 @@
+# Generated by Django 5.2.7 on 2026-10-18 10:27
+
+import django.core.validators
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("zgw_consumers", "0030_service_pool_settings"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="service",
+            name="max_retries",
+            field=models.PositiveSmallIntegerField(
+                default=0,
+                help_text=(
+                    "Maximum number of times to retry a request after a connection "
+                    "error or a response with one of the retry status codes. 0 "
+                    "disables retries."
+                ),
+                verbose_name="maximum retries",
+            ),
+        ),
+        migrations.AddField(
+            model_name="service",
+            name="retry_backoff_factor",
+            field=models.FloatField(
+                default=0.5,
+                help_text=(
+                    "Delay (in seconds) before the second retry, doubled for every "
+                    "next retry. The first retry happens immediately."
+                ),
+                validators=[django.core.validators.MinValueValidator(0)],
+                verbose_name="retry backoff factor",
+            ),
+        ),
+        migrations.AddField(
+            model_name="service",
+            name="retry_backoff_jitter",
+            field=models.FloatField(
+                default=0.0,
+                help_text=(
+                    "Maximum random delay (in seconds) added to the backoff, so that "
+                    "clients don't retry all at the same time."
+                ),
+                validators=[django.core.validators.MinValueValidator(0)],
+                verbose_name="retry backoff jitter",
+            ),
+        ),
+        migrations.AddField(
+            model_name="service",
+            name="retry_idempotent_only",
+            field=models.BooleanField(
+                default=True,
+                help_text=(
+                    "Only retry requests with idempotent methods (e.g. GET, PUT and "
+                    "DELETE), so that e.g. POST requests are never sent twice."
+                ),
+                verbose_name="retry idempotent requests only",
+            ),
+        ),
+        migrations.AddField(
+            model_name="service",
+            name="retry_respect_retry_after",
+            field=models.BooleanField(
+                default=True,
+                help_text=(
+                    "Wait as long as the Retry-After header of the response asks for "
+                    "before retrying."
+                ),
+                verbose_name="respect Retry-After",
+            ),
+        ),
+        migrations.AddField(
+            model_name="service",
+            name="retry_status_codes",
+            field=models.CharField(
+                blank=True,
+                default="429,502,503,504",
+                help_text="Comma-separated HTTP status codes of responses to retry.",
+                max_length=255,
+                validators=[
+                    django.core.validators.validate_comma_separated_integer_list
+                ],
+                verbose_name="retry status codes",
+            ),
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 5.2.7 on 2026-10-18 11:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("zgw_consumers", "0031_service_retry_settings"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="service",
+            name="circuit_breaker_reset_timeout",
+            field=models.PositiveSmallIntegerField(
+                default=30,
+                help_text=(
+                    "Time (in seconds) after which a single request is sent to check "
+                    "whether the service has recovered."
+                ),
+                verbose_name="circuit breaker reset timeout",
+            ),
+        ),
+        migrations.AddField(
+            model_name="service",
+            name="circuit_breaker_threshold",
+            field=models.PositiveSmallIntegerField(
+                default=0,
+                help_text=(
+                    "Number of consecutive failed requests (connection errors, "
+                    "timeouts or server errors) after which requests fail "
+                    "immediately, without contacting the service. 0 disables the "
+                    "circuit breaker."
+                ),
+                verbose_name="circuit breaker threshold",
+            ),
+        ),
+    ]
@@ -0,0 +1,52 @@
+# Generated by Django 5.2.7 on 2026-10-18 11:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("zgw_consumers", "0032_service_circuit_breaker"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="service",
+            name="connect_timeout",
+            field=models.PositiveSmallIntegerField(
+                blank=True,
+                help_text=(
+                    "Timeout (in seconds) to establish a connection. Leave empty to "
+                    "use the timeout."
+                ),
+                null=True,
+                verbose_name="connect timeout",
+            ),
+        ),
+        migrations.AddField(
+            model_name="service",
+            name="read_timeout",
+            field=models.PositiveSmallIntegerField(
+                blank=True,
+                help_text=(
+                    "Timeout (in seconds) to wait for data from the server. Leave "
+                    "empty to use the timeout."
+                ),
+                null=True,
+                verbose_name="read timeout",
+            ),
+        ),
+        migrations.AddField(
+            model_name="service",
+            name="total_timeout",
+            field=models.PositiveSmallIntegerField(
+                blank=True,
+                help_text=(
+                    "Maximum time (in seconds) to connect and wait for the response, "
+                    "regardless of the connect and read timeouts. Leave empty for no "
+                    "limit."
+                ),
+                null=True,
+                verbose_name="total timeout",
+            ),
+        ),
+    ]
@@ -1,13 +1,19 @@
+from itertools import chain
+
 from django.db.models.fields.related_lookups import get_normalized_value
 from django.db.models.lookups import Exact as _Exact, In as _In
 
 from zgw_consumers.models import Service
+from zgw_consumers.utils import NOTSET, NotSet
 
 from .fields import ServiceUrlField
 
 
-def decompose_value(value: str) -> tuple[Service | None, str | None]:
-    service = Service.get_service(value)
+def decompose_value(
+    value: str, service: Service | None | NotSet = NOTSET
+) -> tuple[Service | None, str | None]:
+    if isinstance(service, NotSet):
+        service = Service.get_service(value)
     if not service:
         return None, None
 
@@ -42,11 +48,16 @@ class ServiceUrlFieldMixin:
             field.get_col(alias, output_field=field)
             for field in [target._base_field, target._relative_field]
         ]
-        value = self.rhs if self.get_db_prep_lookup_value_is_iterable else [self.rhs]
+        # the value is iterated twice, a generator would be exhausted by the first pass
+        value = list(
+            self.rhs if self.get_db_prep_lookup_value_is_iterable else [self.rhs]
+        )
+        # resolve the services for all values at once instead of one query per value
+        services = Service.get_services_for_urls(value)
 
         prepared_values = []
         for rhs in value:
-            base_value, relative_value = decompose_value(rhs)
+            base_value, relative_value = decompose_value(rhs, services[rhs])
 
             # convert model instances to int for FK fields
             base_normalized_value = get_normalized_value(base_value, base_lhs)[0]
@@ -124,16 +135,22 @@ class Exact(ServiceUrlFieldMixin, _Exact):
 @ServiceUrlField.register_lookup
 class In(ServiceUrlFieldMixin, _In):
     """
-    This realization will add additional DB query for every item in rhs list
-    Possible optimization is to cache Service.get_service(value)
+    The rhs values are decomposed with a single DB query for all the items, see
+    Service.get_services_for_urls
     Other solution would be not to decompose rhs value, but to combine lhs fields
     But it will require additional join, which will complicate the implementation
     The concatenation can slow down the DB query even more since the indexes are
     usually not used with it
+
+    Long lists are split into OR-ed IN clauses of at most
+    connection.ops.max_in_list_size() items. On PostgreSQL, lists with more than
+    postgres_unnest_threshold items are passed as two arrays instead, which keeps the
+    number of query parameters (and the query plan) independent of the list size
     """
 
+    postgres_unnest_threshold: int | None = 100
+
     def as_sql(self, compiler, connection):
-        # TODO: support connection.ops.max_in_list_size()
         # process lhs
         (
             base_lhs_sql,
@@ -141,13 +158,44 @@ class In(ServiceUrlFieldMixin, _In):
             relative_lhs_sql,
             _relative_lhs_params,
         ) = self.split_lhs(compiler, connection)
+        lhs_sql = f"({base_lhs_sql}, {relative_lhs_sql})"
 
         # process rhs
         _, rhs_params = self.process_rhs(compiler, connection)
-        rhs_sql = "IN (" + ", ".join(["(%s, %s)"] * len(rhs_params)) + ")"
 
-        # combine
-        params = sum(rhs_params, [])  # noqa: RUF017
-        sql = f"({base_lhs_sql}, {relative_lhs_sql}) {rhs_sql}"
+        if (
+            connection.vendor == "postgresql"
+            and self.postgres_unnest_threshold is not None
+            and len(rhs_params) > self.postgres_unnest_threshold
+        ):
+            return self.as_unnest_sql(lhs_sql, rhs_params, connection)
+
+        # combine, respecting the maximum number of items in an IN clause
+        chunk_size = connection.ops.max_in_list_size() or len(rhs_params)
+        in_clauses = []
+        params = []
+        for offset in range(0, len(rhs_params), chunk_size):
+            chunk = rhs_params[offset : offset + chunk_size]
+            in_clauses.append(
+                f"{lhs_sql} IN (" + ", ".join(["(%s, %s)"] * len(chunk)) + ")"
+            )
+            params.extend(chain.from_iterable(chunk))
 
+        if len(in_clauses) == 1:
+            return in_clauses[0], params
+        return "(" + " OR ".join(in_clauses) + ")", params
+
+    def as_unnest_sql(self, lhs_sql: str, rhs_params, connection):
+        target = self.lhs.target
+        base_type = target._base_field.db_type(connection)
+        relative_type = target._relative_field.db_type(connection)
+
+        sql = (
+            f"{lhs_sql} IN "
+            f"(SELECT * FROM unnest(%s::{base_type}[], %s::{relative_type}[]))"
+        )
+        params = [
+            [base for base, _relative in rhs_params],
+            [relative for _base, relative in rhs_params],
+        ]
         return sql, params
@@ -1,15 +1,23 @@
 from __future__ import annotations
 
+import copy
 import importlib.util
 import logging
 import socket
 import uuid
-from collections.abc import Callable
-from typing import Self
+from collections.abc import Callable, Iterable
+from functools import reduce
+from operator import or_
+from typing import Self, cast
 from urllib.parse import urlparse, urlsplit, urlunsplit
 
 from django.core.exceptions import ValidationError
+from django.core.validators import (
+    MinValueValidator,
+    validate_comma_separated_integer_list,
+)
 from django.db import models
+from django.db.models import Q
 from django.db.models.functions import Length
 from django.utils.translation import gettext_lazy as _
 
@@ -183,6 +191,135 @@ class Service(_Service):
         help_text=_("Timeout (in seconds) for HTTP calls."),
         default=10,
     )
+    connect_timeout = models.PositiveSmallIntegerField(
+        _("connect timeout"),
+        null=True,
+        blank=True,
+        help_text=_(
+            "Timeout (in seconds) to establish a connection. Leave empty to use the "
+            "timeout."
+        ),
+    )
+    read_timeout = models.PositiveSmallIntegerField(
+        _("read timeout"),
+        null=True,
+        blank=True,
+        help_text=_(
+            "Timeout (in seconds) to wait for data from the server. Leave empty to use "
+            "the timeout."
+        ),
+    )
+    total_timeout = models.PositiveSmallIntegerField(
+        _("total timeout"),
+        null=True,
+        blank=True,
+        help_text=_(
+            "Maximum time (in seconds) to connect and wait for the response, "
+            "regardless of the connect and read timeouts. Leave empty for no limit."
+        ),
+    )
+    pool_connections = models.PositiveSmallIntegerField(
+        _("connection pools"),
+        null=True,
+        blank=True,
+        help_text=_(
+            "Number of connection pools (one per host) to cache. Leave empty to use "
+            "the default."
+        ),
+    )
+    pool_maxsize = models.PositiveSmallIntegerField(
+        _("maximum connections per pool"),
+        null=True,
+        blank=True,
+        help_text=_(
+            "Maximum number of connections to keep open per host. Leave empty to use "
+            "the default."
+        ),
+    )
+    pool_block = models.BooleanField(
+        _("block when pool is full"),
+        default=False,
+        help_text=_(
+            "Wait for a connection to become available when all connections of the "
+            "pool are in use, instead of opening an extra connection that is "
+            "discarded afterwards."
+        ),
+    )
+    keep_alive = models.BooleanField(
+        _("keep connections alive"),
+        default=True,
+        help_text=_(
+            "Reuse connections for subsequent requests. If disabled, connections are "
+            "closed after every request."
+        ),
+    )
+    max_retries = models.PositiveSmallIntegerField(
+        _("maximum retries"),
+        default=0,
+        help_text=_(
+            "Maximum number of times to retry a request after a connection error or a "
+            "response with one of the retry status codes. 0 disables retries."
+        ),
+    )
+    retry_backoff_factor = models.FloatField(
+        _("retry backoff factor"),
+        default=0.5,
+        validators=[MinValueValidator(0)],
+        help_text=_(
+            "Delay (in seconds) before the second retry, doubled for every next "
+            "retry. The first retry happens immediately."
+        ),
+    )
+    retry_backoff_jitter = models.FloatField(
+        _("retry backoff jitter"),
+        default=0.0,
+        validators=[MinValueValidator(0)],
+        help_text=_(
+            "Maximum random delay (in seconds) added to the backoff, so that clients "
+            "don't retry all at the same time."
+        ),
+    )
+    retry_status_codes = models.CharField(
+        _("retry status codes"),
+        max_length=255,
+        blank=True,
+        default="429,502,503,504",
+        validators=[validate_comma_separated_integer_list],
+        help_text=_("Comma-separated HTTP status codes of responses to retry."),
+    )
+    retry_idempotent_only = models.BooleanField(
+        _("retry idempotent requests only"),
+        default=True,
+        help_text=_(
+            "Only retry requests with idempotent methods (e.g. GET, PUT and DELETE), "
+            "so that e.g. POST requests are never sent twice."
+        ),
+    )
+    retry_respect_retry_after = models.BooleanField(
+        _("respect Retry-After"),
+        default=True,
+        help_text=_(
+            "Wait as long as the Retry-After header of the response asks for before "
+            "retrying."
+        ),
+    )
+    circuit_breaker_threshold = models.PositiveSmallIntegerField(
+        _("circuit breaker threshold"),
+        default=0,
+        help_text=_(
+            "Number of consecutive failed requests (connection errors, timeouts or "
+            "server errors) after which requests fail immediately, without "
+            "contacting the service. 0 disables the circuit breaker."
+        ),
+    )
+    circuit_breaker_reset_timeout = models.PositiveSmallIntegerField(
+        _("circuit breaker reset timeout"),
+        default=30,
+        help_text=_(
+            "Time (in seconds) after which a single request is sent to check whether "
+            "the service has recovered."
+        ),
+    )
 
     objects = ServiceManager()
 
@@ -293,6 +430,11 @@ class Service(_Service):
 
     @classmethod
     def get_service(cls, url: str) -> Self | None:
+        if cls is Service and zgw_settings.get_setting("SERVICE_INDEX_ENABLED"):
+            from zgw_consumers.registry import service_index
+
+            return cast("Self | None", service_index.get_service(url))
+
         split_url = urlsplit(url)
         scheme_and_domain = urlunsplit(split_url[:2] + ("", "", ""))
 
@@ -309,6 +451,46 @@ class Service(_Service):
 
         return None
 
+    @classmethod
+    def get_services_for_urls(cls, urls: Iterable[str]) -> dict[str, Self | None]:
+        """
+        Resolve a batch of URLs to their services with at most one query.
+
+        The candidate services are fetched for all the distinct schemes and domains at
+        once, after which each URL is matched against the longest API root it starts
+        with, like :meth:`get_service` does.
+        """
+        from zgw_consumers.registry import (
+            build_prefix_table,
+            get_scheme_and_domain,
+            match_url,
+            service_index,
+        )
+
+        urls = list(dict.fromkeys(urls))
+        if not urls:
+            return {}
+
+        if cls is Service and zgw_settings.get_setting("SERVICE_INDEX_ENABLED"):
+            table = service_index.get_table()
+            # hand out one copy per service rather than the indexed instances
+            copies: dict[int, Service] = {}
+            resolved = {}
+            for url in urls:
+                if (service := match_url(table, url)) is not None:
+                    if service.pk not in copies:
+                        copies[service.pk] = copy.copy(service)
+                    service = copies[service.pk]
+                resolved[url] = service
+            return cast("dict[str, Self | None]", resolved)
+
+        prefixes = {get_scheme_and_domain(url) for url in urls}
+        query = reduce(or_, (Q(api_root__startswith=prefix) for prefix in prefixes))
+        table = build_prefix_table(cls.objects.filter(query))
+        return cast(
+            "dict[str, Self | None]", {url: match_url(table, url) for url in urls}
+        )
+
 
 class NLXConfig(SingletonModel):
     directory = models.CharField(
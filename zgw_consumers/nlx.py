@@ -1,119 +1,358 @@
+import codecs
+import functools
+import hashlib
 import json
 import logging
-from collections.abc import Iterable
+import re
+import threading
+import time
+from collections.abc import Iterable, Iterator
 from itertools import groupby
 from typing import TypedDict
 
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
 import requests
 from ape_pie import APIClient
-from requests import JSONDecodeError
 from requests.models import PreparedRequest, Request, Response
 from requests.utils import guess_json_utf
 
+from . import settings as zgw_settings
 from .mixins import RefreshTokenMixin
 from .models import NLXConfig, Service
+from .registry import get_shared_cache, get_shared_version
 
 logger = logging.getLogger(__name__)
 
 
-def _rewrite_url(value: str, rewrites: Iterable[tuple[str, str]]) -> str | None:
-    for start, replacement in rewrites:
-        if not value.startswith(start):
-            continue
+class CompiledRewrites:
+    """
+    Replace the prefix of URLs, using a single regex that matches all the prefixes.
+
+    The longest matching prefix wins.
+    """
+
+    def __init__(self, rewrites: Iterable[tuple[str, str]]):
+        self.rewrites = list(rewrites)
+        self._replacements: dict[str, str] = {}
+        for start, replacement in self.rewrites:
+            self._replacements.setdefault(start, replacement)
+
+        prefixes = sorted(self._replacements, key=len, reverse=True)
+        self._pattern = (
+            re.compile("|".join(re.escape(prefix) for prefix in prefixes))
+            if prefixes
+            else None
+        )
+
+    def __call__(self, value: str) -> str | None:
+        if self._pattern is None or (match := self._pattern.match(value)) is None:
+            return None
+        return self._replacements[match.group()] + value[match.end() :]
+
+    @functools.cached_property
+    def _json_replacements(self) -> dict[bytes, bytes]:
+        replacements = {}
+        for start, replacement in self._replacements.items():
+            # the prefixes as they appear in a UTF-8 JSON document, with and without
+            # escaped forward slashes
+            encoded_start = json.dumps(start, ensure_ascii=False)[1:-1]
+            encoded_replacement = json.dumps(replacement, ensure_ascii=False)[1:-1]
+            for escape in (False, True):
+                if escape:
+                    encoded_start = encoded_start.replace("/", "\\/")
+                    encoded_replacement = encoded_replacement.replace("/", "\\/")
+                replacements.setdefault(
+                    encoded_start.encode("utf-8"), encoded_replacement.encode("utf-8")
+                )
+        return replacements
+
+    @functools.cached_property
+    def _json_pattern(self) -> re.Pattern[bytes] | None:
+        if not (prefixes := sorted(self._json_replacements, key=len, reverse=True)):
+            return None
+        # the prefix must be at the start of a string, an escaped quote is not
+        alternatives = b"|".join(re.escape(prefix) for prefix in prefixes)
+        return re.compile(rb'(?<!\\)"(' + alternatives + rb")")
+
+    def sub_json(self, content: bytes) -> bytes:
+        """
+        Replace the prefixes of the strings in a UTF-8 encoded JSON document.
+
+        This is a single pass over the bytes, without decoding the JSON. Unlike
+        :func:`rewrite_data`, this also rewrites the keys of objects that start with a
+        prefix.
+        """
+        if (pattern := self._json_pattern) is None:
+            return content
+        replacements = self._json_replacements
+        return pattern.sub(lambda match: b'"' + replacements[match[1]], content)
+
+    def sub_json_chunks(self, chunks: Iterable[bytes]) -> Iterator[bytes]:
+        """
+        Like :meth:`sub_json`, for a UTF-8 encoded JSON document that is streamed.
+
+        The tail of every chunk that may hold the start of a prefix is carried over to
+        the next chunk.
+        """
+        if (pattern := self._json_pattern) is None:
+            yield from chunks
+            return
+
+        replacements = self._json_replacements
+        # the quote and the longest prefix
+        max_length = 1 + max(len(prefix) for prefix in replacements)
+        # the first byte of the buffer was already emitted, it's only kept for the
+        # lookbehind of the pattern
+        buffer = b" "
+        for chunk in chunks:
+            buffer += chunk
+            # matches that start before the limit fit in the buffer
+            limit = len(buffer) - max_length + 1
+            if limit <= 1:
+                continue
 
-        return value.replace(start, replacement, 1)
+            output, position = [], 1
+            for match in pattern.finditer(buffer, 1):
+                if match.start() >= limit:
+                    break
+                output += (buffer[position : match.start()], b'"')
+                output.append(replacements[match[1]])
+                position = match.end()
+
+            end = max(position, limit)
+            output.append(buffer[position:end])
+            buffer = buffer[end - 1 :]
+            if data := b"".join(output):
+                yield data
+
+        if len(buffer) > 1:
+            yield pattern.sub(lambda match: b'"' + replacements[match[1]], buffer)[1:]
+
+
+class RewriteTable:
+    def __init__(self, rewrites: Iterable[tuple[str, str]]):
+        rewrites = list(rewrites)
+        self.forwards = CompiledRewrites(rewrites)
+        self.backwards = CompiledRewrites(
+            (to_value, from_value) for from_value, to_value in rewrites
+        )
 
-    return None
+
+class RewriteTableCache:
+    """
+    Process-local cache of the rewrite table, discarded when a service changes.
+
+    Changes made in other processes are noticed after at most
+    ``SERVICE_INDEX_CHECK_INTERVAL`` seconds: through the version in the
+    ``SERVICE_INDEX_CACHE`` if configured, otherwise by reading the rewrites from the
+    database again (the table is only recompiled if they changed).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._table: RewriteTable | None = None
+        self._version: int | None = None
+        # monotonic time of the last check for changes in other processes
+        self._checked_at = 0.0
+        self._generation = 0
+
+    def _check_due(self) -> bool:
+        interval = zgw_settings.get_setting("SERVICE_INDEX_CHECK_INTERVAL")
+        return time.monotonic() - self._checked_at >= interval
+
+    def get_table(self) -> RewriteTable:
+        table = self._table
+        if table is not None and not self._check_due():
+            return table
+
+        cache = get_shared_cache()
+        version = get_shared_version(cache) if cache is not None else None
+        self._checked_at = time.monotonic()
+        if table is not None and cache is not None and version == self._version:
+            return table
+
+        generation = self._generation
+        rewrites = self._get_rewrites()
+        if table is None or rewrites != table.forwards.rewrites:
+            table = RewriteTable(rewrites)
+        with self._lock:
+            if generation == self._generation:
+                self._table = table
+                self._version = version
+        return table
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._generation += 1
+            self._table = None
+
+    @staticmethod
+    def _get_rewrites() -> list[tuple[str, str]]:
+        return list(Service.objects.exclude(nlx="").values_list("api_root", "nlx"))
+
+
+rewrite_table_cache = RewriteTableCache()
+
+
+@receiver(
+    [post_save, post_delete], sender=Service, dispatch_uid="invalidate_rewrite_table"
+)
+def invalidate_rewrite_table(sender, **kwargs) -> None:
+    rewrite_table_cache.invalidate()
+    # other threads may rebuild the table before the change is committed
+    transaction.on_commit(rewrite_table_cache.invalidate)
 
 
 class Rewriter:
     def __init__(self):
-        qs = Service.objects.exclude(nlx="").values_list("api_root", "nlx")
-        self._rewrites = qs
+        self._table = rewrite_table_cache.get_table()
 
     @property
     def rewrites(self) -> list[tuple[str, str]]:
-        return list(self._rewrites)
+        return self._table.forwards.rewrites
 
     @property
     def reverse_rewrites(self) -> list[tuple[str, str]]:
-        return [(to_value, from_value) for from_value, to_value in self.rewrites]
+        return self._table.backwards.rewrites
 
     def forwards(self, data: list | dict) -> None:
         """
         Rewrite URLs from from_value to to_value.
         """
-        self._rewrite(data, self.rewrites)
+        self._rewrite(data, self._table.forwards)
 
     def backwards(self, data: list | dict) -> None:
         """
         Rewrite URLs from to_value to from_value.
         """
-        self._rewrite(data, self.reverse_rewrites)
-
-    def _rewrite(self, data: list | dict, rewrites: Iterable[tuple[str, str]]) -> None:
-        if isinstance(data, list):
-            new_items = []
-            for item in data:
-                if isinstance(item, str):
-                    new_value = _rewrite_url(item, rewrites)
-                    if new_value:
-                        new_items.append(new_value)
-                    else:
-                        new_items.append(item)
-                else:
-                    self._rewrite(item, rewrites=rewrites)
-                    new_items.append(item)
-
-            # replace list elements
-            assert len(new_items) == len(data)
-            for i in range(len(data)):
-                data[i] = new_items[i]
-            return
+        self._rewrite(data, self._table.backwards)
 
-        if not isinstance(data, dict):
-            return
+    def _rewrite(self, data: list | dict, rewrite: CompiledRewrites) -> None:
+        rewrite_data(data, rewrite)
 
-        for key, value in data.items():
-            if isinstance(value, (dict, list)):
-                self._rewrite(value, rewrites=rewrites)
-                continue
 
-            elif not isinstance(value, str):
-                continue
+def rewrite_data(data: list | dict, rewrite: CompiledRewrites) -> None:
+    """
+    Rewrite the URLs in decoded JSON data in place.
+    """
+    if isinstance(data, list):
+        items = enumerate(data)
+    elif isinstance(data, dict):
+        items = data.items()
+    else:
+        return
+
+    for key, value in items:
+        if isinstance(value, dict | list):
+            rewrite_data(value, rewrite)
+        elif isinstance(value, str):
+            rewritten = rewrite(value)
+            if rewritten is not None:
+                data[key] = rewritten  # pyright: ignore[reportArgumentType,reportCallIssue]
 
-            assert isinstance(value, str)
 
-            rewritten = _rewrite_url(value, rewrites)
-            if rewritten is not None:
-                data[key] = rewritten
+def is_json_content_type(content_type: str) -> bool:
+    # there are alternatives to application/json, like application/hal+json
+    mime_type = content_type.partition(";")[0].strip().lower()
+    return "json" in mime_type
 
 
-def nlx_rewrite_hook(response: Response, *args, **kwargs):
+def rewrite_json_content(
+    content: bytes, encoding: str | None, rewrite: CompiledRewrites
+) -> bytes:
+    encoding = encoding or guess_json_utf(content) or "utf-8"
+    if codecs.lookup(encoding).name in ("utf-8", "ascii"):
+        return rewrite.sub_json(content)
+
+    # other encodings are rare, fall back to decoding and encoding the JSON
     try:
-        json_data = response.json()
-    # it may be a different content type than JSON! Checking for application/json
-    # content type header is a bit annoying because there are alternatives like
-    # application/hal+json :(
-    except JSONDecodeError:
+        data = json.loads(content.decode(encoding))
+    except ValueError:
+        return content
+    rewrite_data(data, rewrite)
+    return json.dumps(data).encode(encoding)
+
+
+class NLXRewritingBody:
+    """
+    Wrapper of the raw body of a JSON response from a service behind an NLX outway.
+
+    The outway URLs in the body are replaced with the URLs of the services while it is
+    read, with a single pass over the bytes rather than decoding and encoding the JSON.
+    A streamed body (``stream=True``) is rewritten chunk by chunk instead of being
+    loaded in memory. Everything else is delegated to the wrapped body.
+    """
+
+    def __init__(self, raw, rewrite: CompiledRewrites, encoding: str | None):
+        self._raw = raw
+        self._rewrite = rewrite
+        self._encoding = encoding
+        self._chunks: Iterator[bytes] | None = None
+        self._buffer = b""
+
+    def __getattr__(self, name: str):
+        return getattr(self._raw, name)
+
+    def stream(
+        self, amt: int | None = 2**16, decode_content: bool | None = None
+    ) -> Iterator[bytes]:
+        chunks = self._raw.stream(amt, decode_content=decode_content)
+        encoding = self._encoding
+        if encoding is None or codecs.lookup(encoding).name in ("utf-8", "ascii"):
+            yield from self._rewrite.sub_json_chunks(chunks)
+        # other encodings are rare, rewrite the complete body
+        elif content := b"".join(chunks):
+            yield rewrite_json_content(content, encoding, self._rewrite)
+
+    def read(
+        self, amt: int | None = None, decode_content: bool | None = None, **kwargs
+    ) -> bytes:
+        if self._chunks is None:
+            self._chunks = self.stream(decode_content=decode_content)
+        while amt is None or len(self._buffer) < amt:
+            if (chunk := next(self._chunks, None)) is None:
+                break
+            self._buffer += chunk
+        size = len(self._buffer) if amt is None else amt
+        data, self._buffer = self._buffer[:size], self._buffer[size:]
+        return data
+
+
+def looks_like_json(content: bytes) -> bool:
+    """
+    Check whether a body without a content type is a JSON object or array.
+    """
+    if (encoding := guess_json_utf(content)) is None:
+        return False
+    head = content[:64].decode(encoding, errors="ignore").lstrip()
+    return head[:1] in ("{", "[")
+
+
+def nlx_rewrite_hook(response: Response, *args, **kwargs):
+    content_type = response.headers.get("Content-Type")
+    if content_type is not None:
+        # skip binary and other non-JSON bodies without reading them
+        if not is_json_content_type(content_type):
+            return response
+    elif kwargs.get("stream") or not looks_like_json(response.content or b""):
+        # a streamed body of unknown type is not read, to keep it out of memory
         return response
 
-    # rewrite the JSON
+    rewrite = rewrite_table_cache.get_table().backwards
     logger.debug(
         "NLX client: Rewriting response JSON to replace outway URLs",
         extra={"request": response.request},
     )
-    # apply similar logic to response.json() itself
-    encoding = (
-        response.encoding
-        or guess_json_utf(response.content)
-        or response.apparent_encoding
-    )
-    assert encoding
-    rewriter = Rewriter()
-    rewriter.backwards(json_data)
-    response._content = json.dumps(json_data).encode(encoding)
-
+    if response._content is False and hasattr(response.raw, "stream"):
+        # defer the rewriting until the body is read
+        response.raw = NLXRewritingBody(response.raw, rewrite, response.encoding)
+    elif content := response.content:
+        # the body was read already
+        response._content = rewrite_json_content(content, response.encoding, rewrite)
     return response
 
 
@@ -169,7 +408,66 @@ class ServiceType(TypedDict):
     organization: Organization
 
 
+def get_directory_cache_key(directory_url: str) -> str:
+    url_hash = hashlib.sha256(directory_url.encode("utf-8")).hexdigest()
+    return f"zgw_consumers:nlx_directory:{url_hash}"
+
+
+def fetch_nlx_services(
+    url: str, cert: tuple[str, str] | None = None
+) -> list[tuple[Organization, list[ServiceType]]]:
+    timeout = zgw_settings.get_setting("NLX_DIRECTORY_TIMEOUT")
+    response = requests.get(url, cert=cert, timeout=timeout)
+    response.raise_for_status()
+
+    services = response.json()["services"]
+    services.sort(key=lambda s: (s["organization"]["serial_number"], s["name"]))
+
+    services_per_organization = [
+        (k, list(v)) for k, v in groupby(services, key=lambda s: s["organization"])
+    ]
+    return services_per_organization
+
+
+def _refresh_nlx_services(
+    cache_key: str, url: str, cert: tuple[str, str] | None
+) -> list[tuple[Organization, list[ServiceType]]]:
+    services = fetch_nlx_services(url, cert=cert)
+    # keep stale results around for a while, in case the directory is unavailable
+    ttl = zgw_settings.get_setting("NLX_DIRECTORY_CACHE_TTL")
+    max_stale = zgw_settings.get_setting("NLX_DIRECTORY_CACHE_MAX_STALE")
+    cache.set(cache_key, (time.time(), services), timeout=ttl + max_stale)
+    return services
+
+
+def _refresh_nlx_services_in_background(
+    cache_key: str, url: str, cert: tuple[str, str] | None
+) -> None:
+    lock_key = f"{cache_key}:refresh"
+    lock_timeout = zgw_settings.get_setting("NLX_DIRECTORY_TIMEOUT") * 2
+    if not cache.add(lock_key, True, timeout=lock_timeout):
+        # another thread or process is already refreshing
+        return
+
+    def refresh():
+        try:
+            _refresh_nlx_services(cache_key, url, cert)
+        except Exception:
+            logger.warning("Failed refreshing the NLX services", exc_info=True)
+        finally:
+            cache.delete(lock_key)
+
+    threading.Thread(target=refresh, name="refresh_nlx_services", daemon=True).start()
+
+
 def get_nlx_services() -> list[tuple[Organization, list[ServiceType]]]:
+    """
+    Get the services of the NLX directory, grouped per organization.
+
+    The result is cached for ``NLX_DIRECTORY_CACHE_TTL`` seconds. After that, the
+    cached result is still returned (for at most ``NLX_DIRECTORY_CACHE_MAX_STALE``
+    seconds) while it is refreshed in the background.
+    """
     config = NLXConfig.get_solo()
     if not config.outway or not config.directory_url:
         return []
@@ -183,13 +481,18 @@ def get_nlx_services() -> list[tuple[Organization, list[ServiceType]]]:
         else None
     )
 
-    response = requests.get(url, cert=cert)
-    response.raise_for_status()
+    cache_key = get_directory_cache_key(directory)
+    if (cached := cache.get(cache_key)) is None:
+        return _refresh_nlx_services(cache_key, url, cert)
 
-    services = response.json()["services"]
-    services.sort(key=lambda s: (s["organization"]["serial_number"], s["name"]))
+    fetched_at, services = cached
+    if time.time() - fetched_at >= zgw_settings.get_setting("NLX_DIRECTORY_CACHE_TTL"):
+        _refresh_nlx_services_in_background(cache_key, url, cert)
+    return services
 
-    services_per_organization = [
-        (k, list(v)) for k, v in groupby(services, key=lambda s: s["organization"])
-    ]
-    return services_per_organization
+
+@receiver(post_save, sender=NLXConfig, dispatch_uid="clear_nlx_directory_cache")
+def clear_nlx_directory_cache(sender, instance: NLXConfig, **kwargs) -> None:
+    # the certificate may have changed
+    if directory := instance.directory_url:
+        cache.delete(get_directory_cache_key(directory))
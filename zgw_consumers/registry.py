@@ -0,0 +1,208 @@
+"""
+Process-local index of the configured services.
+
+Resolving a URL to its :class:`zgw_consumers.models.Service` requires a database query
+for every URL. When the ``SERVICE_INDEX_ENABLED`` setting is enabled, all services are
+loaded once (lazily) into a prefix table and the lookups are answered from memory. The
+index is discarded whenever a service or a certificate is saved or deleted.
+
+With the ``SERVICE_INDEX_CACHE`` setting, a snapshot of the services is shared through
+the Django cache together with a version number that is bumped on every change, so that
+other processes know when to reload their index. The version is checked at most once
+per ``SERVICE_INDEX_CHECK_INTERVAL`` seconds.
+"""
+
+import copy
+import functools
+import hashlib
+import logging
+import threading
+import time
+from collections import defaultdict
+from collections.abc import Iterable
+from urllib.parse import urlsplit, urlunsplit
+
+from django.core.cache import BaseCache, caches
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from simple_certmanager.models import Certificate as BaseCertificate
+
+from . import settings as zgw_settings
+from .models import Certificate, Service
+
+logger = logging.getLogger(__name__)
+
+type PrefixTable = dict[str, list[Service]]
+
+VERSION_CACHE_KEY = "zgw_consumers:service_index:version"
+SNAPSHOT_CACHE_TIMEOUT = 24 * 60 * 60  # 1 day
+
+
+def get_scheme_and_domain(url: str) -> str:
+    split_url = urlsplit(url)
+    return urlunsplit(split_url[:2] + ("", "", ""))
+
+
+def build_prefix_table(services: Iterable[Service]) -> PrefixTable:
+    """
+    Group the services per scheme and domain, longest API root first.
+    """
+    table: defaultdict[str, list[Service]] = defaultdict(list)
+    for service in services:
+        table[get_scheme_and_domain(service.api_root)].append(service)
+
+    for candidates in table.values():
+        candidates.sort(key=lambda service: len(service.api_root), reverse=True)
+    return dict(table)
+
+
+def match_url(table: PrefixTable, url: str) -> Service | None:
+    """
+    Find the service with the longest API root that the URL starts with.
+    """
+    for candidate in table.get(get_scheme_and_domain(url), ()):
+        if url.startswith(candidate.api_root):
+            return candidate
+    return None
+
+
+def get_shared_cache() -> BaseCache | None:
+    alias = zgw_settings.get_setting("SERVICE_INDEX_CACHE")
+    return caches[alias] if alias else None
+
+
+def get_shared_version(cache: BaseCache) -> int:
+    if (version := cache.get(VERSION_CACHE_KEY)) is None:
+        # start from the current time rather than 1, so that the version still
+        # increases if the key was evicted from the cache
+        cache.add(VERSION_CACHE_KEY, time.time_ns(), timeout=None)
+        version = cache.get(VERSION_CACHE_KEY)
+    return version
+
+
+def bump_shared_version(cache: BaseCache) -> None:
+    try:
+        cache.incr(VERSION_CACHE_KEY)
+    except ValueError:
+        cache.add(VERSION_CACHE_KEY, time.time_ns(), timeout=None)
+
+
+@functools.cache
+def get_snapshot_schema() -> str:
+    """
+    Return a marker of the fields of the cached instances, so that a snapshot pickled
+    by a process running another version of the models is not loaded.
+    """
+    attnames = [
+        (model._meta.label, field.attname)
+        for model in (Service, Certificate)
+        for field in model._meta.fields
+        if field.concrete
+    ]
+    return hashlib.sha256(repr(attnames).encode("utf-8")).hexdigest()[:16]
+
+
+def _query_services() -> list[Service]:
+    # include the certificates, so that building clients does not need extra queries
+    return list(
+        Service.objects.select_related("client_certificate", "server_certificate")
+    )
+
+
+class ServiceIndex:
+    """
+    Longest-prefix index of all services, keyed on their API root.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._table: PrefixTable | None = None
+        # version of the shared snapshot the table was built from, if any
+        self._version: int | None = None
+        # monotonic time of the last check of the shared version
+        self._checked_at = 0.0
+        # bumped on every invalidation, so that a load that raced with a change to
+        # the services does not store outdated data
+        self._generation = 0
+
+    def _get_services(
+        self, cache: BaseCache | None, version: int | None
+    ) -> list[Service]:
+        if cache is None or version is None:
+            return _query_services()
+
+        snapshot_key = f"zgw_consumers:service_index:{get_snapshot_schema()}:{version}"
+        services = cache.get(snapshot_key)
+        if services is None:
+            services = _query_services()
+            cache.set(snapshot_key, services, timeout=SNAPSHOT_CACHE_TIMEOUT)
+        return services
+
+    def _load(self, cache: BaseCache | None, version: int | None) -> PrefixTable:
+        generation = self._generation
+        services = self._get_services(cache, version)
+        table = build_prefix_table(services)
+        with self._lock:
+            if generation == self._generation:
+                self._table = table
+                self._version = version
+        logger.debug(
+            "Loaded the service index with %d services",
+            len(services),
+            extra={"version": version},
+        )
+        return table
+
+    def _check_due(self) -> bool:
+        interval = zgw_settings.get_setting("SERVICE_INDEX_CHECK_INTERVAL")
+        return time.monotonic() - self._checked_at >= interval
+
+    def get_table(self) -> PrefixTable:
+        cache = get_shared_cache()
+        table = self._table
+        # only ask the shared cache for the version every so often, local changes
+        # clear the table right away
+        if table is not None and (cache is None or not self._check_due()):
+            return table
+
+        version = get_shared_version(cache) if cache is not None else None
+        self._checked_at = time.monotonic()
+        if table is None or version != self._version:
+            table = self._load(cache, version)
+        return table
+
+    def get_service(self, url: str) -> Service | None:
+        service = match_url(self.get_table(), url)
+        # hand out copies so that callers can't mutate the indexed instances
+        return copy.copy(service) if service is not None else None
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._generation += 1
+            self._table = None
+        if (cache := get_shared_cache()) is not None:
+            bump_shared_version(cache)
+
+
+service_index = ServiceIndex()
+
+
+@receiver(
+    [post_save, post_delete], sender=Service, dispatch_uid="invalidate_service_index"
+)
+@receiver(
+    [post_save, post_delete],
+    sender=BaseCertificate,
+    dispatch_uid="invalidate_service_index_base_certificate",
+)
+@receiver(
+    [post_save, post_delete],
+    sender=Certificate,
+    dispatch_uid="invalidate_service_index_certificate",
+)
+def invalidate_service_index(sender, **kwargs) -> None:
+    service_index.invalidate()
+    # other threads may reload the index before the change is committed
+    transaction.on_commit(service_index.invalidate)
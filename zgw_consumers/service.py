@@ -2,6 +2,16 @@
 Expose the public API.
 """
 
-from .utils import pagination_helper
+from .utils import (
+    PaginationCursor,
+    model_pagination_helper,
+    pagination_helper,
+    parallel_pagination_helper,
+)
 
-__all__ = ["pagination_helper"]
+__all__ = [
+    "PaginationCursor",
+    "model_pagination_helper",
+    "pagination_helper",
+    "parallel_pagination_helper",
+]
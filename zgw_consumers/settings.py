@@ -6,6 +6,14 @@ from .constants import NLXDirectories
 
 NLX_OUTWAY_TIMEOUT = 2  # 2 seconds
 
+# Timeout (in seconds) for fetching the services from the NLX directory
+NLX_DIRECTORY_TIMEOUT = 10
+
+# Seconds to cache the NLX directory services before refreshing them, and how long
+# after that the outdated services may still be used during the refresh
+NLX_DIRECTORY_CACHE_TTL = 60 * 60
+NLX_DIRECTORY_CACHE_MAX_STALE = 24 * 60 * 60
+
 NLX_DIRECTORY_URLS = {
     NLXDirectories.demo: os.getenv(
         "NLX_DIRECTORY_URL_DEMO",
@@ -17,6 +25,35 @@ NLX_DIRECTORY_URLS = {
     ),
 }
 
+# Resolve service URLs from a process-local index instead of querying the database
+SERVICE_INDEX_ENABLED = False
+
+# Alias of the Django cache used to share the service index between processes
+SERVICE_INDEX_CACHE = None
+
+# Seconds between checks of the shared service index version
+SERVICE_INDEX_CHECK_INTERVAL = 2
+
+# Default connection pool sizes, for services that don't specify their own
+CLIENT_POOL_CONNECTIONS = 10
+CLIENT_POOL_MAXSIZE = 10
+
+# Alias of the Django cache that holds the circuit breaker state of the services
+CIRCUIT_BREAKER_CACHE = "default"
+
+# Renew cached ZGW JWTs this many seconds before they expire
+ZGW_JWT_RENEWAL_MARGIN = 30
+
+# Refresh OAuth2 tokens after this fraction of their lifetime
+OAUTH2_TOKEN_REFRESH_FRACTION = 0.8
+
+# Seconds that one process may take to fetch an OAuth2 token while others wait for it
+OAUTH2_TOKEN_LOCK_TIMEOUT = 10
+
+# Number of worker threads of the process-wide pool used by ``parallel(shared=True)``,
+# ``None`` uses the default of :class:`concurrent.futures.ThreadPoolExecutor`
+PARALLEL_SHARED_POOL_SIZE = None
+
 
 def get_setting(name: str):
     default = globals()[name]
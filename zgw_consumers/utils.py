@@ -1,11 +1,20 @@
 import logging
-from collections.abc import Callable
-from typing import TypedDict
+import math
+from collections.abc import Callable, Iterator
+from concurrent import futures
+from contextlib import ExitStack
+from dataclasses import asdict, dataclass
+from itertools import batched, islice
+from typing import Self, TypedDict, cast, overload
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
 
 from django.http import HttpRequest
 
 from ape_pie.client import APIClient
 
+from .api_models.base import Model, factory
+from .concurrent import parallel
+
 logger = logging.getLogger(__name__)
 
 
@@ -47,32 +56,305 @@ class PaginatedResponseData(TypedDict):
     results: list
 
 
+@dataclass
+class PaginationCursor:
+    """
+    Position of :func:`pagination_helper` in the results of a paginated API endpoint.
+
+    ``page_url`` is the URL of the current page (empty for the page passed to the
+    helper), and ``offset`` the number of its results that were yielded. The helper
+    updates the cursor while iterating, so saving it after processing a result allows
+    a crawl to be resumed after that result.
+    """
+
+    page_url: str = ""
+    offset: int = 0
+
+    def to_dict(self) -> dict:
+        """
+        Serialize the cursor to JSON-compatible data, e.g. for the cache or a
+        ``JSONField``.
+        """
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: dict) -> Self:
+        return cls(page_url=data.get("page_url", ""), offset=data.get("offset", 0))
+
+
+def _fetch_page(client: APIClient, url: str, **kwargs) -> PaginatedResponseData:
+    response = client.get(url, **kwargs)
+    response.raise_for_status()
+    return response.json()
+
+
+def _fetch_known_page(
+    client: APIClient, url: str, **kwargs
+) -> PaginatedResponseData | None:
+    """
+    Fetch a page whose URL was derived from the count, or return ``None`` if it no
+    longer exists because the collection shrank.
+    """
+    response = client.get(url, **kwargs)
+    if response.status_code == 404:
+        return None
+    response.raise_for_status()
+    return response.json()
+
+
+def _log_max_requests_reached(max_requests: int | None) -> None:
+    logger.info(
+        "Number of requests while retrieving paginated results reached "
+        "maximum of %s requests, returning results",
+        max_requests,
+    )
+
+
 def pagination_helper(
     client: APIClient,
-    paginated_data: PaginatedResponseData,
+    paginated_data: PaginatedResponseData | None,
     max_requests: int | None = None,
+    prefetch: bool = False,
+    cursor: PaginationCursor | None = None,
     **kwargs,
 ):
     """
     Fetch results from a paginated API endpoint, and optionally limit the number of
     requests to perform when fetching new pages by specifying the ``max_requests``
     argument
+
+    With ``prefetch=True``, the next page is fetched in a background thread while the
+    results of the current page are consumed. The client is then used from another
+    thread, so use it as a context manager (or use a pooled client) to keep its session
+    open.
+
+    Pass a :class:`PaginationCursor` to keep track of the position, or to resume from
+    a saved position. When its ``page_url`` is set, that page is fetched and
+    ``paginated_data`` is ignored (and may be ``None``).
     """
+    resume = cursor is not None and bool(cursor.page_url)
+    if paginated_data is None and not resume:
+        raise ValueError(
+            "'paginated_data' is required unless resuming from a cursor with a page URL"
+        )
+
+    def _iter():
+        data, num_requests = paginated_data, 0
+        page_url, offset = "", 0
+        if cursor is not None:
+            page_url, offset = cursor.page_url, cursor.offset
+        if resume:
+            data = _fetch_page(client, page_url, **kwargs)
+        assert data is not None
 
-    def _iter(_data, num_requests=0):
-        yield from _data["results"]
-        if next_url := _data.get("next"):
-            if max_requests and num_requests >= max_requests:
-                logger.info(
-                    "Number of requests while retrieving paginated results reached "
-                    "maximum of %s requests, returning results",
-                    max_requests,
+        with ExitStack() as stack:
+            executor = (
+                stack.enter_context(parallel(max_workers=1)) if prefetch else None
+            )
+            while True:
+                next_url = data.get("next")
+                limit_reached = bool(
+                    next_url and max_requests and num_requests >= max_requests
                 )
-                return
-            response = client.get(next_url, **kwargs)
-            num_requests += 1
-            response.raise_for_status()
-            data = response.json()
-            yield from _iter(data, num_requests)
-
-    return _iter(paginated_data)
+                future = (
+                    executor.submit(_fetch_page, client, next_url, **kwargs)
+                    if executor is not None and next_url and not limit_reached
+                    else None
+                )
+
+                if cursor is None:
+                    yield from islice(data["results"], offset, None)
+                else:
+                    for index, result in enumerate(
+                        islice(data["results"], offset, None), start=offset + 1
+                    ):
+                        cursor.page_url, cursor.offset = page_url, index
+                        yield result
+                offset = 0
+
+                if not next_url:
+                    return
+                if limit_reached:
+                    _log_max_requests_reached(max_requests)
+                    return
+
+                data = (
+                    future.result()
+                    if future is not None
+                    else _fetch_page(client, next_url, **kwargs)
+                )
+                page_url = next_url
+                num_requests += 1
+
+    return _iter()
+
+
+def _get_page_urls(
+    next_url: str, count: int | None, page_size: int
+) -> list[str] | None:
+    """
+    Build the URLs of the remaining pages from the ``page`` query parameter of the
+    ``next`` link, or return ``None`` if the endpoint doesn't paginate that way.
+    """
+    if not isinstance(count, int) or not page_size:
+        return None
+
+    scheme, netloc, path, query, fragment = urlsplit(next_url)
+    params = parse_qsl(query, keep_blank_values=True)
+    try:
+        next_page = int(dict(params)["page"])
+    except (KeyError, ValueError):
+        return None
+
+    def _page_url(page: int) -> str:
+        query = urlencode(
+            [(key, str(page) if key == "page" else value) for key, value in params]
+        )
+        return urlunsplit((scheme, netloc, path, query, fragment))
+
+    num_pages = math.ceil(count / page_size)
+    return [_page_url(page) for page in range(next_page, num_pages + 1)]
+
+
+def parallel_pagination_helper(
+    client: APIClient,
+    paginated_data: PaginatedResponseData,
+    max_workers: int = 4,
+    ordered: bool = True,
+    max_requests: int | None = None,
+    **kwargs,
+):
+    """
+    Fetch results from a paginated API endpoint like :func:`pagination_helper`, but
+    fetch the remaining pages concurrently.
+
+    The number of pages is derived from the ``count`` and the size of the first page,
+    and their URLs from the ``page`` query parameter of the ``next`` link. At most
+    ``max_workers`` pages are fetched (or waiting to be consumed) at the same time.
+    With ``ordered=False``, the results of a page are yielded as soon as it is fetched
+    rather than in page order. If the collection shrinks while fetching, the pages
+    beyond its end are empty or don't exist (404) - no more pages are fetched after
+    the first such page.
+    Endpoints that don't paginate this way fall back to :func:`pagination_helper`.
+
+    The client is used from several threads, so use it as a context manager (or use a
+    pooled client) to keep its session open.
+    """
+    next_url = paginated_data.get("next")
+    page_urls = (
+        _get_page_urls(
+            next_url, paginated_data.get("count"), len(paginated_data["results"])
+        )
+        if next_url
+        else []
+    )
+    if page_urls is None:
+        return pagination_helper(
+            client, paginated_data, max_requests=max_requests, **kwargs
+        )
+    if max_requests:
+        page_urls = page_urls[:max_requests]
+
+    def _iter():
+        yield from paginated_data["results"]
+
+        last_data: PaginatedResponseData | None = paginated_data
+        remaining_urls = iter(page_urls)
+        # in-flight page requests, in page order
+        pending: dict[futures.Future, str] = {}
+        exhausted = False
+        with parallel(max_workers=max_workers) as executor:
+
+            def _submit_next() -> None:
+                if exhausted:
+                    return
+                if (url := next(remaining_urls, None)) is not None:
+                    future = executor.submit(_fetch_known_page, client, url, **kwargs)
+                    pending[future] = url
+
+            # only keep max_workers pages in flight, so that pages that were fetched
+            # early don't pile up in memory
+            for _ in range(max_workers):
+                _submit_next()
+
+            try:
+                while pending:
+                    if ordered:
+                        future = next(iter(pending))
+                    else:
+                        done, _ = futures.wait(
+                            pending, return_when=futures.FIRST_COMPLETED
+                        )
+                        future = next(iter(done))
+                    data = future.result()
+                    if pending.pop(future) == page_urls[-1]:
+                        last_data = data
+                    if data is None or not data["results"]:
+                        # the collection shrank, the pages after this one don't
+                        # exist either (but the ones before it may still be pending)
+                        exhausted = True
+                        continue
+                    _submit_next()
+                    yield from data["results"]
+            finally:
+                # don't fetch the remaining pages when the caller stops iterating
+                for future in pending:
+                    future.cancel()
+
+        num_requests = len(page_urls)
+        if exhausted or last_data is None or not last_data.get("next"):
+            return
+        if max_requests and num_requests >= max_requests:
+            _log_max_requests_reached(max_requests)
+            return
+
+        # the count grew while fetching, continue with the pages after the last one
+        yield from pagination_helper(
+            client,
+            cast(PaginatedResponseData, {**last_data, "results": []}),
+            max_requests=max_requests - num_requests if max_requests else None,
+            **kwargs,
+        )
+
+    return _iter()
+
+
+@overload
+def model_pagination_helper[M: Model](
+    client: APIClient,
+    paginated_data: PaginatedResponseData,
+    model: type[M],
+    batch_size: None = None,
+    **kwargs,
+) -> Iterator[M]: ...
+
+
+@overload
+def model_pagination_helper[M: Model](
+    client: APIClient,
+    paginated_data: PaginatedResponseData,
+    model: type[M],
+    batch_size: int,
+    **kwargs,
+) -> Iterator[list[M]]: ...
+
+
+def model_pagination_helper[M: Model](
+    client: APIClient,
+    paginated_data: PaginatedResponseData,
+    model: type[M],
+    batch_size: int | None = None,
+    **kwargs,
+) -> Iterator[M] | Iterator[list[M]]:
+    """
+    Fetch results from a paginated API endpoint with :func:`pagination_helper`, and
+    convert them to instances of ``model`` while iterating.
+
+    Instances are yielded one at a time, or in lists of ``batch_size`` instances, so
+    only a page of raw results and a batch of instances are kept in memory. The
+    ``kwargs`` are passed to :func:`pagination_helper`.
+    """
+    results = pagination_helper(client, paginated_data, **kwargs)
+    if batch_size is None:
+        return (factory(model, result) for result in results)
+    return (factory(model, list(batch)) for batch in batched(results, batch_size))